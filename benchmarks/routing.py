@@ -0,0 +1,337 @@
+"""
+Routing throughput benchmarks for different tree shapes and iterators.
+
+Run from the repository root:
+
+    python -m benchmarks.routing run --sizes 10 1000 100000 --output before.json
+    python -m benchmarks.routing compare before.json after.json
+"""
+
+import sys
+import json
+import time
+import asyncio
+import platform
+import argparse
+import subprocess
+
+from typing import Any, Callable, Optional
+from dataclasses import dataclass, asdict
+
+from silvanus.integration.http import parse_path, get_path_filters, TrieRouter, RegexRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.routing.stack import StackRouter
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import FirstTrueRouterIterator, AllTrueRouterIterator
+
+
+SHAPES = ["flat", "deep", "wide", "http"]
+ITERATORS = {
+    "first": FirstTrueRouterIterator,
+    "all": AllTrueRouterIterator
+}
+ENGINES = ["tree", "compiled", "stack", "trie", "regex"]
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ValueFilter:
+    key: str
+    value: int
+
+    def __call__(self, data: RoutingData) -> bool:
+        return data.request_data.get(self.key, None) == self.value
+
+
+@dataclass(slots=True, kw_only=True)
+class Case:
+    router: Any
+    hit: Callable[[], RoutingData]
+    miss: Callable[[], RoutingData]
+
+
+@dataclass(slots=True, kw_only=True)
+class Result:
+    shape: str
+    size: int
+    engine: str
+    iterator: str
+    case: str
+
+    requests: int
+    requests_per_second: float
+
+    mean_us: float
+    p50_us: float
+    p90_us: float
+    p99_us: float
+
+
+def get_flat(size: int) -> Case:
+    router = SimpleRouter()
+    router.add_routers(
+        [SimpleRouter(filters=[ValueFilter(key="value", value=index)], data=("value", index)) for index in range(size)]
+    )
+
+    return Case(
+        router=router,
+        hit=lambda: RoutingData(request_data={"value": size - 1}),
+        miss=lambda: RoutingData(request_data={"value": -1})
+    )
+
+
+def get_deep(size: int, depth: int) -> Case:
+    router = SimpleRouter()
+
+    for chain in range(max(size // depth, 1)):
+        parent = SimpleRouter(filters=[ValueFilter(key="chain", value=chain)])
+        router.add_router(parent)
+
+        # a different filter on every level, so none of them is memoized
+        for level in range(depth - 1):
+            child = SimpleRouter(filters=[ValueFilter(key=f"level{level}", value=chain)])
+            parent.add_router(child)
+            parent = child
+
+        parent.data = ("chain", chain)
+
+    chain = max(size // depth, 1) - 1
+    hit = {"chain": chain, **{f"level{level}": chain for level in range(depth - 1)}}
+
+    return Case(
+        router=router,
+        hit=lambda: RoutingData(request_data=dict(hit)),
+        miss=lambda: RoutingData(request_data={"chain": -1})
+    )
+
+
+def get_wide(size: int) -> Case:
+    groups = max(int(size ** 0.5), 1)
+    router = SimpleRouter()
+
+    for group in range(groups):
+        group_router = SimpleRouter(filters=[ValueFilter(key="group", value=group)])
+        group_router.add_routers(
+            [
+                SimpleRouter(filters=[ValueFilter(key="value", value=index)], data=(group, index))
+                for index in range(size // groups)
+            ]
+        )
+        router.add_router(group_router)
+
+    return Case(
+        router=router,
+        hit=lambda: RoutingData(request_data={"group": groups - 1, "value": size // groups - 1}),
+        miss=lambda: RoutingData(request_data={"group": groups - 1, "value": -1})
+    )
+
+
+def get_http_paths(size: int) -> list[str]:
+    return [f"/resource{index // 4}/{{id:int}}/action{index % 4}" for index in range(size)]
+
+
+def get_http(size: int, engine: str) -> Case:
+    paths = get_http_paths(size)
+
+    if engine in ("trie", "regex"):
+        router = TrieRouter() if engine == "trie" else RegexRouter()
+
+        for path in paths:
+            router.add_path(path, SimpleRouter(data=path), method="GET")
+
+    else:
+        router = SimpleRouter()
+        router.add_routers(
+            [SimpleRouter(filters=get_path_filters(path, {}, method="GET"), data=path) for path in paths]
+        )
+
+    hit = paths[-1].replace("{id:int}", "10")
+
+    return Case(
+        router=router,
+        hit=lambda: parse_path(hit, app_data={}, method="GET"),
+        miss=lambda: parse_path("/missing/10/action0", app_data={}, method="GET")
+    )
+
+
+def get_case(shape: str, size: int, engine: str, depth: int) -> Optional[Case]:
+    if engine in ("trie", "regex"):
+        if shape != "http":
+            return None
+
+        return get_http(size, engine)
+
+    if shape == "flat":
+        case = get_flat(size)
+
+    elif shape == "deep":
+        case = get_deep(size, depth)
+
+    elif shape == "wide":
+        case = get_wide(size)
+
+    else:
+        case = get_http(size, "tree")
+
+    if engine == "compiled":
+        case.router = case.router.compile()
+
+    elif engine == "stack":
+        case.router = StackRouter(case.router)
+
+    return case
+
+
+def get_percentile(timings: list[int], percentile: float) -> float:
+    return timings[min(int(len(timings) * percentile), len(timings) - 1)] / 1000
+
+
+async def check(case: Case, iterator: Any):
+    """
+    Makes sure the hit request matches and the miss request doesn't, so
+    the cases measure what they are named after
+    """
+    for case_name, get_data, expected in [("hit", case.hit, True), ("miss", case.miss, False)]:
+        result = await case.router.route(get_data(), iterator)
+        matched = result is not iterator.on_nothing and result != []
+
+        if matched != expected:
+            raise RuntimeError(f"the {case_name} request returned {result!r}")
+
+
+async def measure(router: Any, get_data: Callable[[], RoutingData], iterator: Any, requests: int) -> list[int]:
+    datas = [get_data() for _ in range(requests)]
+    timings = []
+
+    for data in datas:
+        started = time.perf_counter_ns()
+        await router.route(data, iterator)
+        timings.append(time.perf_counter_ns() - started)
+
+    return timings
+
+
+async def run(arguments: argparse.Namespace) -> list[Result]:
+    results = []
+
+    for shape in arguments.shapes:
+        for size in arguments.sizes:
+            for engine in arguments.engines:
+                case = get_case(shape, size, engine, arguments.depth)
+
+                if case is None:
+                    continue
+
+                for iterator_name in arguments.iterators:
+                    iterator = ITERATORS[iterator_name]()
+
+                    await check(case, iterator)
+
+                    for case_name, get_data in [("hit", case.hit), ("miss", case.miss)]:
+                        await measure(case.router, get_data, iterator, min(arguments.requests, 10))
+                        timings = await measure(case.router, get_data, iterator, arguments.requests)
+
+                        total = sum(timings)
+                        timings.sort()
+
+                        result = Result(
+                            shape=shape,
+                            size=size,
+                            engine=engine,
+                            iterator=iterator_name,
+                            case=case_name,
+                            requests=len(timings),
+                            requests_per_second=len(timings) / (total / 1e9),
+                            mean_us=total / len(timings) / 1000,
+                            p50_us=get_percentile(timings, 0.5),
+                            p90_us=get_percentile(timings, 0.9),
+                            p99_us=get_percentile(timings, 0.99)
+                        )
+                        results.append(result)
+
+                        print(
+                            f"{shape:>5} {size:>7} {engine:>8} {iterator_name:>5} {case_name:>4}"
+                            f" {result.requests_per_second:>12.0f} req/s"
+                            f" p50 {result.p50_us:>10.1f}us p99 {result.p99_us:>10.1f}us",
+                            flush=True
+                        )
+
+    return results
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def get_key(result: dict[str, Any]) -> tuple:
+    return result["shape"], result["size"], result["engine"], result["iterator"], result["case"]
+
+
+def compare(base_path: str, new_path: str):
+    with open(base_path) as file:
+        base = {get_key(result): result for result in json.load(file)["results"]}
+
+    with open(new_path) as file:
+        new = {get_key(result): result for result in json.load(file)["results"]}
+
+    for key in sorted(base.keys() & new.keys()):
+        ratio = new[key]["requests_per_second"] / base[key]["requests_per_second"]
+        shape, size, engine, iterator, case = key
+
+        print(
+            f"{shape:>5} {size:>7} {engine:>8} {iterator:>5} {case:>4}"
+            f" {base[key]['requests_per_second']:>12.0f} -> {new[key]['requests_per_second']:>12.0f} req/s"
+            f" x{ratio:.2f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    run_parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000, 10000, 100000])
+    run_parser.add_argument("--engines", nargs="+", choices=ENGINES, default=ENGINES)
+    run_parser.add_argument("--iterators", nargs="+", choices=list(ITERATORS), default=list(ITERATORS))
+    run_parser.add_argument("--requests", type=int, default=200)
+    run_parser.add_argument("--depth", type=int, default=32, help="the depth of the chains of the deep shape")
+    run_parser.add_argument("--output", help="the json file for the results")
+
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "compare":
+        compare(arguments.base, arguments.new)
+        return
+
+    results = asyncio.run(run(arguments))
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(
+                {
+                    "commit": get_commit(),
+                    "python": sys.version,
+                    "platform": platform.platform(),
+                    "created": time.time(),
+                    "results": [asdict(result) for result in results]
+                },
+                file,
+                indent=2
+            )
+
+
+if __name__ == "__main__":
+    main()
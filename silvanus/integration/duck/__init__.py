@@ -0,0 +1,2 @@
+from .filters import BaseFilter, filter_fix
+from .bus import EventRouter, get_event_data
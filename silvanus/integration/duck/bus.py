@@ -0,0 +1,99 @@
+from typing import Any, Optional
+
+from silvanus.routing.ordered import OrderedRouter
+from silvanus.structures.base import (
+    RoutingData,
+    RoutingDataPool,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterProtocol
+)
+
+
+__all__ = ["EventRouter", "get_event_data"]
+
+
+def get_event_data(event: Any, app_data: dict[str, Any], pool: Optional[RoutingDataPool] = None) -> RoutingData:
+    """
+    :param pool: if set, the data is taken from the pool, release it back
+    to the pool when the event is handled
+    """
+    request_data = {"event": event}
+
+    if pool is not None:
+        return pool.acquire(app_data=app_data, request_data=request_data)
+
+    return RoutingData(
+        request_data=request_data,
+        app_data=app_data
+    )
+
+
+class EventRouter(OrderedRouter):
+    """
+    An event bus for the duck integration. The subscribers are stored by
+    the event class, an event is passed only to the subscribers of its
+    class and its base classes (in the order they were subscribed), so
+    the cost of dispatching depends on the number of matching subscribers
+    only. The subscribers of each event class are resolved once and cached.
+    Routers added with add_router get every event.
+    """
+
+    __slots__ = (
+        "_subscribers",
+        "_resolved"
+    )
+
+    def __init__(
+            self,
+            filters: Optional[list[FilterProtocol]] = None,
+            middlewares: Optional[list[MiddlewareProtocol]] = None,
+            inner_middlewares: Optional[list[MiddlewareProtocol]] = None,
+            data: Any = None,
+            parent: Optional["RouterProtocol"] = None,
+            name: Optional[str] = None,
+            **kwargs: Any
+    ):
+        """
+        :param kwargs: the other arguments of SimpleRouter
+        """
+        super().__init__(
+            filters=filters,
+            middlewares=middlewares,
+            inner_middlewares=inner_middlewares,
+            data=data,
+            parent=parent,
+            name=name,
+            **kwargs
+        )
+
+        self._subscribers: dict[type, list[tuple[int, RouterProtocol]]] = {}
+        self._resolved: dict[type, list[RouterProtocol]] = {}
+
+    def subscribe(self, event_type: type, router: "RouterProtocol"):
+        self._subscribers.setdefault(event_type, []).append((self._add_child(router), router))
+        self._children_changed()
+
+    def _children_changed(self):
+        self._resolved.clear()
+        super()._children_changed()
+
+    def _resolve(self, event_type: type) -> list["RouterProtocol"]:
+        selected = list(self._always)
+
+        for base in event_type.__mro__:
+            selected.extend(self._subscribers.get(base, ()))
+
+        selected.sort(key=lambda item: item[0])
+
+        return [router for _, router in selected]
+
+    def select_routers(self, data: RoutingData) -> list["RouterProtocol"]:
+        event_type = type(data.request_data["event"])
+
+        routers = self._resolved.get(event_type, None)
+
+        if routers is None:
+            routers = self._resolved[event_type] = self._resolve(event_type)
+
+        return routers
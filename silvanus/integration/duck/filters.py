@@ -1,15 +1,23 @@
 from typing import Any
+from itertools import count
 
 from silvanus.structures import RoutingData
 
 
+_model_ids = count(1)
+
+
 class BaseFilter:
-    __current_id__ = []
+    """
+    Every instance is a distinct filter, so its result is memoized
+    separately from the other instances of the same class
+    """
 
     def __new__(cls, *args, **kwargs):
-        cls.__current_id__.append(1)
-        cls.__model_id__ = len(cls.__current_id__)
-        return super().__new__(cls)
+        self = super().__new__(cls)
+        self.__model_id__ = next(_model_ids)
+
+        return self
 
     def __hash__(self):
         return self.__model_id__
@@ -2,9 +2,15 @@
 
 from .base import (
     parse_path,
+    PathSegments,
     PathFilter,
     MethodFilter,
     TypeFilter,
     get_path_filters,
-    LenghtFilter
+    LenghtFilter,
+    PathTemplate,
+    PathMatch,
+    get_path_template
 )
+from .trie import TrieRouter
+from .regex import RegexRouter
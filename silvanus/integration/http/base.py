@@ -1,10 +1,17 @@
 
 
-from typing import Any, Callable
+import re
+
+from typing import Any, Callable, ClassVar, Optional, Sequence, TYPE_CHECKING
+from functools import lru_cache
 
 from dataclasses import dataclass
 
-from silvanus.structures import RoutingData
+from silvanus.structures import RoutingData, RoutingDataPool, FilterResult, FILTER_PASSED, FILTER_FAILED
+
+if TYPE_CHECKING:
+    from silvanus.structures.base import RouterProtocol, RouterSchema
+    from silvanus.strategy.routers.base import RouterIteratorProtocol
 
 
 TypeFilterType = Callable[[str], Any]
@@ -15,6 +22,10 @@ STRING_PARAM_TYPES: dict[str, TypeFilterType] = {
 }
 
 
+_MISSING = object()
+_FAILED = object()
+
+
 @dataclass(slots=True, kw_only=True, frozen=True)
 class TypeFilter:
     index: int
@@ -22,20 +33,36 @@ class TypeFilter:
     name: str
     value_type: TypeFilterType
 
-    async def __call__(self, data: RoutingData) -> bool:
-        if data.request_data["request_len"] < self.index:
-            return False
+    # writes filters_data, so it is never moved by FilterProfile
+    pinned: ClassVar[bool] = True
+
+    def __call__(self, data: RoutingData) -> FilterResult:
+        if data.request_data["request_len"] <= self.index:
+            return FILTER_FAILED
+
+        # the segments are converted once per request, whatever the number
+        # of the filters with the same index and type. Failures are cached too
+        cache = data.request_cache
+        key = (TypeFilter, self.index, self.value_type)
 
-        current_string: str = data.request_data["request_path_strings"][self.index]
+        result = cache.get(key, _MISSING)
 
-        try:
-            result = self.value_type(current_string)
+        if result is _MISSING:
+            current_string: str = data.request_data["request_path_strings"][self.index]
 
-            data.filters_data[self.name] = result
-            return True
+            try:
+                result = self.value_type(current_string)
 
-        except ValueError:
-            return False
+            except ValueError:
+                result = _FAILED
+
+            cache[key] = result
+
+        if result is _FAILED:
+            return FILTER_FAILED
+
+        data.filters_data[self.name] = result
+        return FILTER_PASSED
 
 
 @dataclass(slots=True, kw_only=True, frozen=True)
@@ -44,40 +71,218 @@ class PathFilter:
 
     text: str
 
-    async def __call__(self, data: RoutingData) -> bool:
-        if data.request_data["request_len"] < self.index:
-            return False
+    def __call__(self, data: RoutingData) -> FilterResult:
+        if data.request_data["request_len"] <= self.index:
+            return FILTER_FAILED
 
         current_string = data.request_data["request_path_strings"][self.index]
 
-        return current_string == self.text
+        return FILTER_PASSED if current_string == self.text else FILTER_FAILED
 
 
 @dataclass(slots=True, kw_only=True, frozen=True)
 class MethodFilter:
     method: str
 
-    async def __call__(self, data: RoutingData) -> bool:
-        return data.request_data["request_method"] == self.method
+    index_key: ClassVar[str] = "request_method"
+
+    @property
+    def index_value(self) -> str:
+        return self.method
+
+    def __call__(self, data: RoutingData) -> FilterResult:
+        return FILTER_PASSED if data.request_data["request_method"] == self.method else FILTER_FAILED
+
+    def batch(self, datas: list[RoutingData]) -> list[bool]:
+        method = self.method
+
+        return [data.request_data["request_method"] == method for data in datas]
 
 
 @dataclass(slots=True, kw_only=True, frozen=True)
 class LenghtFilter:
     lenght: int
 
-    async def __call__(self, data: RoutingData) -> bool:
-        return data.request_data["request_len"] == self.lenght
+    index_key: ClassVar[str] = "request_len"
 
+    @property
+    def index_value(self) -> int:
+        return self.lenght
 
-def parse_path(path: str, app_data: dict[str, Any], method: str, limiter="/") -> RoutingData:
-    splitted = path.split(limiter)
+    def __call__(self, data: RoutingData) -> FilterResult:
+        return FILTER_PASSED if data.request_data["request_len"] == self.lenght else FILTER_FAILED
 
-    return RoutingData(
-        request_data={
+    def batch(self, datas: list[RoutingData]) -> list[bool]:
+        lenght = self.lenght
+
+        return [data.request_data["request_len"] == lenght for data in datas]
+
+
+PathSourceType = str | bytes | bytearray | memoryview
+
+
+@lru_cache(maxsize=None)
+def _get_binary_limiter_pattern(limiter: str) -> re.Pattern:
+    return re.compile(re.escape(limiter.encode()))
+
+
+_BINARY_SUFFIX_PATTERN = re.compile(rb"[?#]")
+_BINARY_FRAGMENT_PATTERN = re.compile(rb"#")
+
+
+class PathSegments(Sequence[str]):
+    """
+    The segments of a path, kept as the original str, bytes or memoryview
+    and the end of the path part. The path part is decoded (as utf-8) and
+    split only when a segment is requested for the first time, the filters
+    that check the method or the lenght don't need it at all
+    """
+
+    __slots__ = (
+        "source",
+        "end",
+        "limiter",
+        "lenght",
+        "_strings"
+    )
+
+    def __init__(self, source: PathSourceType, end: int, limiter: str, lenght: int):
+        self.source = source
+        self.end = end
+        self.limiter = limiter
+        self.lenght = lenght
+
+        self._strings: Optional[list[str]] = None
+
+    @property
+    def text(self) -> str:
+        """
+        The path part of the source as a string, without the query and the fragment
+        """
+        path = self.source
+
+        if self.end != len(path):
+            path = path[:self.end]
+
+        if not isinstance(path, str):
+            path = str(path, "utf-8")
+
+        return path
+
+    def _split(self) -> list[str]:
+        self._strings = self.text.split(self.limiter)
+
+        return self._strings
+
+    def __len__(self) -> int:
+        return self.lenght
+
+    def __getitem__(self, index):
+        strings = self._strings
+
+        if strings is None:
+            strings = self._split()
+
+        return strings[index]
+
+    def __iter__(self):
+        strings = self._strings
+
+        if strings is None:
+            strings = self._split()
+
+        return iter(strings)
+
+    def __eq__(self, other):
+        if isinstance(other, (PathSegments, list, tuple)):
+            return list(self) == list(other)
+
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
+
+
+def _split_lazy(path: PathSourceType, limiter: str) -> tuple[PathSegments, Any, Any]:
+    if isinstance(path, memoryview):
+        # memoryview has no find and count, re works on it without a copy
+        found = _BINARY_SUFFIX_PATTERN.search(path)
+        end = len(path) if found is None else found.start()
+
+        found = _BINARY_FRAGMENT_PATTERN.search(path, end)
+        fragment_start = -1 if found is None else found.start()
+
+        lenght = sum(1 for _ in _get_binary_limiter_pattern(limiter).finditer(path, 0, end)) + 1
+
+    else:
+        binary = not isinstance(path, str)
+
+        fragment_start = path.find(b"#" if binary else "#")
+        end = path.find(b"?" if binary else "?", 0, None if fragment_start == -1 else fragment_start)
+
+        if end == -1:
+            end = len(path) if fragment_start == -1 else fragment_start
+
+        lenght = path.count(limiter.encode() if binary else limiter, 0, end) + 1
+
+    query = None
+    fragment = None
+
+    if fragment_start == -1:
+        if end != len(path):
+            query = path[end + 1:]
+
+    else:
+        if end != fragment_start:
+            query = path[end + 1:fragment_start]
+
+        fragment = path[fragment_start + 1:]
+
+    return PathSegments(path, end, limiter, lenght), query, fragment
+
+
+def parse_path(
+        path: PathSourceType,
+        app_data: dict[str, Any],
+        method: str,
+        limiter="/",
+        pool: Optional[RoutingDataPool] = None,
+        lazy: bool = False
+) -> RoutingData:
+    """
+    :param path: str, or bytes / memoryview (utf-8) in the lazy mode
+    :param pool: if set, the data is taken from the pool, release it back
+    to the pool when the request is handled
+    :param lazy: if True, the path is not split and not copied until
+    a segment is requested, request_path_strings is a PathSegments over the
+    original path. The query and the fragment are cut off into
+    request_query and request_fragment (sliced from the path, None if absent)
+    """
+    if lazy:
+        segments, query, fragment = _split_lazy(path, limiter)
+
+        request_data = {
+            "request_len": len(segments),
+            "request_path_strings": segments,
+            "request_method": method,
+            "request_query": query,
+            "request_fragment": fragment
+        }
+
+    else:
+        splitted = path.split(limiter)
+
+        request_data = {
             "request_len": len(splitted),
             "request_path_strings": splitted,
             "request_method": method
-        },
+        }
+
+    if pool is not None:
+        return pool.acquire(app_data=app_data, request_data=request_data)
+
+    return RoutingData(
+        request_data=request_data,
         app_data=app_data
     )
 
@@ -135,3 +340,75 @@ def get_path_filters(
         )
 
     return result
+
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class PathTemplate:
+    method: str
+    lenght: int
+
+    segments: tuple[Optional[PathFilter | TypeFilter], ...]
+
+
+def get_path_template(
+        path: str,
+        param_types: dict[str, TypeFilterType],
+        method: str,
+        limiter="/"
+) -> PathTemplate:
+    filters = get_path_filters(path, param_types=param_types, method=method, limiter=limiter)
+
+    lenght = len(path.split(limiter))
+    segments: list[Optional[PathFilter | TypeFilter]] = [None] * lenght
+
+    for filter_ in filters:
+        if isinstance(filter_, (PathFilter, TypeFilter)):
+            segments[filter_.index] = filter_
+
+    return PathTemplate(
+        method=method,
+        lenght=lenght,
+        segments=tuple(segments)
+    )
+
+
+class PathMatch:
+    __slots__ = ("router", "params")
+
+    def __init__(self, router: "RouterProtocol", params: tuple[tuple[str, Any], ...]):
+        self.router = router
+        self.params = params
+
+    async def route(
+            self,
+            data: RoutingData,
+            iterator: "RouterIteratorProtocol"
+    ) -> Any:
+        for name, value in self.params:
+            data.filters_data[name] = value
+
+        return await self.router.route(data, iterator)
+
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: "RouterIteratorProtocol"
+    ) -> Any:
+        for name, value in self.params:
+            data.filters_data[name] = value
+
+        return self.router.route_sync(data, iterator)
+
+    async def route_many(
+            self,
+            datas: list[RoutingData],
+            iterator: "RouterIteratorProtocol"
+    ) -> list[Any]:
+        for data in datas:
+            for name, value in self.params:
+                data.filters_data[name] = value
+
+        return await self.router.route_many(datas, iterator)
+
+    def get_routers_schema(self, with_parents: bool = False) -> "RouterSchema":
+        return self.router.get_routers_schema(with_parents=with_parents)
@@ -0,0 +1,259 @@
+import re
+
+from typing import Any, Iterator, Optional
+
+from silvanus.routing.ordered import OrderedRouter
+from silvanus.structures.base import (
+    RoutingData,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterProtocol
+)
+
+from .base import (
+    TypeFilter,
+    PathFilter,
+    PathMatch,
+    PathSegments,
+    TypeFilterType,
+    get_path_template
+)
+
+
+__all__ = ["RegexRouter", ]
+
+
+# tighter patterns for the known types, so the regex can tell the routes
+# apart by itself. The converter still decides, the pattern must accept
+# everything the converter accepts
+PARAM_PATTERNS: dict[TypeFilterType, str] = {
+    int: r"\s*[+-]?\d+(?:_\d+)*\s*"
+}
+
+
+class _RegexRoute:
+    __slots__ = (
+        "order",
+        "router",
+        "source",
+        "params",
+        "_pattern"
+    )
+
+    def __init__(
+            self,
+            order: int,
+            router: RouterProtocol,
+            source: str,
+            params: tuple[tuple[str, TypeFilter], ...]
+    ):
+        self.order = order
+        self.router = router
+        self.source = source
+        self.params = params
+
+        self._pattern: Optional[re.Pattern] = None
+
+    @property
+    def pattern(self) -> re.Pattern:
+        if self._pattern is None:
+            self._pattern = re.compile(self.source)
+
+        return self._pattern
+
+    def convert(self, match: re.Match) -> Optional[tuple[tuple[str, Any], ...]]:
+        params = []
+
+        for group, type_filter in self.params:
+            try:
+                value = type_filter.value_type(match.group(group))
+
+            except ValueError:
+                return None
+
+            params.append((type_filter.name, value))
+
+        return tuple(params)
+
+
+class _RegexTable:
+    __slots__ = (
+        "routes",
+        "pattern",
+        "positions"
+    )
+
+    def __init__(self, routes: list[_RegexRoute]):
+        self.routes = routes
+        self.pattern = re.compile("|".join(route.source for route in routes))
+        self.positions = {f"r{position}": position for position in range(len(routes))}
+
+
+class RegexRouter(OrderedRouter):
+    """
+    A router for the http integration that compiles the path templates of
+    its children into one regular expression per method, one alternative
+    (marked with a named group) per route. A request is matched with a single scan, the
+    values of the parameters are converted for the matching route only.
+    If the conversion fails, or if more routes are requested by the
+    iterator (e.g. AllTrueRouterIterator), the following routes are checked
+    one by one. Routers added with add_router are tried for any path, in
+    the order they were registered.
+
+    select_routers returns a generator, the routes are matched only as far
+    as the iterator goes.
+    """
+
+    __slots__ = (
+        "limiter",
+        "_routes",
+        "_tables"
+    )
+
+    def __init__(
+            self,
+            filters: Optional[list[FilterProtocol]] = None,
+            middlewares: Optional[list[MiddlewareProtocol]] = None,
+            inner_middlewares: Optional[list[MiddlewareProtocol]] = None,
+            data: Any = None,
+            parent: Optional["RouterProtocol"] = None,
+            name: Optional[str] = None,
+            limiter: str = "/",
+            **kwargs: Any
+    ):
+        """
+        :param kwargs: the other arguments of SimpleRouter
+        """
+        super().__init__(
+            filters=filters,
+            middlewares=middlewares,
+            inner_middlewares=inner_middlewares,
+            data=data,
+            parent=parent,
+            name=name,
+            **kwargs
+        )
+
+        self.limiter = limiter
+
+        self._routes: dict[str, list[_RegexRoute]] = {}
+        self._tables: dict[str, _RegexTable] = {}
+
+    def _get_segment_pattern(self, value_type: Optional[TypeFilterType]) -> str:
+        pattern = PARAM_PATTERNS.get(value_type, None)
+
+        if pattern is not None:
+            return pattern
+
+        if len(self.limiter) == 1:
+            return f"[^{re.escape(self.limiter)}]*"
+
+        return f"(?:(?!{re.escape(self.limiter)}).)*"
+
+    def add_path(
+            self,
+            path: str,
+            router: "RouterProtocol",
+            method: str,
+            param_types: Optional[dict[str, TypeFilterType]] = None
+    ):
+        if param_types is None:
+            param_types = {}
+
+        template = get_path_template(path, param_types=param_types, method=method, limiter=self.limiter)
+
+        routes = self._routes.setdefault(template.method, [])
+        name = f"r{len(routes)}"
+
+        segments = []
+        params = []
+
+        for segment in template.segments:
+            if isinstance(segment, PathFilter):
+                segments.append(re.escape(segment.text))
+
+            elif isinstance(segment, TypeFilter):
+                group = f"{name}p{len(params)}"
+                params.append((group, segment))
+
+                segments.append(f"(?P<{group}>{self._get_segment_pattern(segment.value_type)})")
+
+            else:
+                segments.append(self._get_segment_pattern(None))
+
+        # the empty group at the end marks the route, it is cheap because it
+        # is only entered when the whole route matched (a group around the
+        # route would be saved and restored on every failed alternative)
+        source = f"{re.escape(self.limiter).join(segments)}(?P<{name}>)"
+
+        routes.append(_RegexRoute(self._add_child(router), router, source, tuple(params)))
+
+        self._tables.pop(template.method, None)
+        self._children_changed()
+
+    def _get_table(self, method: str) -> Optional[_RegexTable]:
+        table = self._tables.get(method, None)
+
+        if table is None:
+            routes = self._routes.get(method, None)
+
+            if routes is None:
+                return None
+
+            table = self._tables[method] = _RegexTable(routes)
+
+        return table
+
+    @staticmethod
+    def _match(table: _RegexTable, path: str) -> Iterator[tuple[int, PathMatch]]:
+        match = table.pattern.fullmatch(path)
+
+        if match is None:
+            return
+
+        routes = table.routes
+        position = table.positions[match.lastgroup]
+
+        while position < len(routes):
+            route = routes[position]
+
+            if match is None:
+                match = route.pattern.fullmatch(path)
+
+            if match is not None:
+                params = route.convert(match)
+
+                if params is not None:
+                    yield route.order, PathMatch(route.router, params)
+
+            match = None
+            position += 1
+
+    def _select(self, table: Optional[_RegexTable], path: str) -> Iterator["RouterProtocol"]:
+        always = iter(self._always)
+        pending = next(always, None)
+
+        if table is not None:
+            for order, router in self._match(table, path):
+                while pending is not None and pending[0] < order:
+                    yield pending[1]
+                    pending = next(always, None)
+
+                yield router
+
+        while pending is not None:
+            yield pending[1]
+            pending = next(always, None)
+
+    def select_routers(self, data: RoutingData) -> Iterator["RouterProtocol"]:
+        request_data = data.request_data
+
+        strings = request_data["request_path_strings"]
+
+        if isinstance(strings, PathSegments):
+            path = strings.text
+
+        else:
+            path = self.limiter.join(strings)
+
+        return self._select(self._get_table(request_data["request_method"]), path)
@@ -0,0 +1,185 @@
+
+
+from typing import Any, Optional
+
+from silvanus.routing.ordered import OrderedRouter
+from silvanus.structures.base import (
+    RoutingData,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterProtocol
+)
+
+from .base import (
+    TypeFilter,
+    PathFilter,
+    PathMatch,
+    TypeFilterType,
+    get_path_template
+)
+
+
+__all__ = ["TrieRouter", ]
+
+
+class _TrieNode:
+    __slots__ = (
+        "literals",
+        "params",
+        "wildcard",
+        "routes"
+    )
+
+    def __init__(self):
+        self.literals: dict[str, _TrieNode] = {}
+        self.params: list[tuple[TypeFilter, _TrieNode]] = []
+        self.wildcard: Optional[_TrieNode] = None
+        self.routes: list[tuple[int, RouterProtocol]] = []
+
+    def get_param(self, type_filter: TypeFilter) -> "_TrieNode":
+        for param, child in self.params:
+            if param.name == type_filter.name and param.value_type is type_filter.value_type:
+                return child
+
+        child = _TrieNode()
+        self.params.append((type_filter, child))
+
+        return child
+
+    def match(
+            self,
+            strings: list[str],
+            index: int,
+            params: tuple[tuple[str, Any], ...],
+            result: list[tuple[int, RouterProtocol, tuple[tuple[str, Any], ...]]]
+    ):
+        if index == len(strings):
+            for order, router in self.routes:
+                result.append((order, router, params))
+
+            return
+
+        current_string = strings[index]
+
+        child = self.literals.get(current_string, None)
+
+        if child is not None:
+            child.match(strings, index + 1, params, result)
+
+        if self.wildcard is not None:
+            self.wildcard.match(strings, index + 1, params, result)
+
+        for type_filter, child in self.params:
+            try:
+                value = type_filter.value_type(current_string)
+
+            except ValueError:
+                continue
+
+            child.match(strings, index + 1, params + ((type_filter.name, value), ), result)
+
+
+class TrieRouter(OrderedRouter):
+    """
+    A router for the http integration that stores the path templates of its
+    children in a trie keyed on method, segment count and literal segments.
+    The routing cost depends on the depth of the request path instead of
+    the number of registered routes. Routers added with add_router are
+    tried for any path, in the order they were registered.
+    """
+
+    __slots__ = (
+        "limiter",
+        "_roots"
+    )
+
+    def __init__(
+            self,
+            filters: Optional[list[FilterProtocol]] = None,
+            middlewares: Optional[list[MiddlewareProtocol]] = None,
+            inner_middlewares: Optional[list[MiddlewareProtocol]] = None,
+            data: Any = None,
+            parent: Optional["RouterProtocol"] = None,
+            name: Optional[str] = None,
+            limiter: str = "/",
+            **kwargs: Any
+    ):
+        """
+        :param kwargs: the other arguments of SimpleRouter
+        """
+        super().__init__(
+            filters=filters,
+            middlewares=middlewares,
+            inner_middlewares=inner_middlewares,
+            data=data,
+            parent=parent,
+            name=name,
+            **kwargs
+        )
+
+        self.limiter = limiter
+
+        self._roots: dict[tuple[str, int], _TrieNode] = {}
+
+    def add_path(
+            self,
+            path: str,
+            router: "RouterProtocol",
+            method: str,
+            param_types: Optional[dict[str, TypeFilterType]] = None
+    ):
+        if param_types is None:
+            param_types = {}
+
+        template = get_path_template(path, param_types=param_types, method=method, limiter=self.limiter)
+
+        node = self._roots.get((template.method, template.lenght), None)
+
+        if node is None:
+            node = _TrieNode()
+            self._roots[(template.method, template.lenght)] = node
+
+        for segment in template.segments:
+            if segment is None:
+                if node.wildcard is None:
+                    node.wildcard = _TrieNode()
+
+                node = node.wildcard
+
+            elif isinstance(segment, PathFilter):
+                child = node.literals.get(segment.text, None)
+
+                if child is None:
+                    child = _TrieNode()
+                    node.literals[segment.text] = child
+
+                node = child
+
+            else:
+                node = node.get_param(segment)
+
+        node.routes.append((self._add_child(router), router))
+        self._children_changed()
+
+    def select_routers(self, data: RoutingData) -> list["RouterProtocol"]:
+        request_data = data.request_data
+
+        node = self._roots.get(
+            (request_data["request_method"], request_data["request_len"]),
+            None
+        )
+
+        if node is None:
+            return [router for _, router in self._always]
+
+        matches = []
+        node.match(request_data["request_path_strings"], 0, (), matches)
+
+        if not self._always and len(matches) < 2:
+            return [PathMatch(router, params) for _, router, params in matches]
+
+        selected = [(order, PathMatch(router, params)) for order, router, params in matches]
+        selected.extend(self._always)
+        selected.sort(key=lambda item: item[0])
+
+        return [router for _, router in selected]
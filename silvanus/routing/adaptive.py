@@ -0,0 +1,108 @@
+from typing import Any
+
+from silvanus.structures.base import FilterProtocol
+
+
+__all__ = ["FilterStats", "FilterProfile"]
+
+
+class FilterStats:
+    __slots__ = (
+        "calls",
+        "rejections",
+        "total_ns"
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.rejections = 0
+        self.total_ns = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejections / self.calls
+
+    @property
+    def rank(self) -> float:
+        """
+        The expected cost of the filter per rejected request, the filters
+        with the lowest rank should run first
+        """
+        if not self.calls:
+            return float("inf")
+
+        if not self.rejections:
+            return float("inf")
+
+        return self.mean_ns / self.rejection_rate
+
+
+class FilterProfile:
+    """
+    Measures the cost and the rejection rate of the filters of a router and
+    orders them so that cheap and selective filters run first. Filters with
+    a true "pinned" attribute (e.g. filters that write filters_data) keep
+    their position, the other filters are only moved between them.
+    """
+
+    __slots__ = (
+        "interval",
+        "stats",
+        "_routes"
+    )
+
+    def __init__(self, interval: int):
+        """
+        :param interval: the number of routing calls between reorderings
+        """
+        self.interval = interval
+        self.stats: dict[FilterProtocol, FilterStats] = {}
+
+        self._routes = 0
+
+    def record(self, filter_: FilterProtocol, ns: int, result: Any):
+        stats = self.stats.get(filter_, None)
+
+        if stats is None:
+            stats = self.stats[filter_] = FilterStats()
+
+        stats.calls += 1
+        stats.total_ns += ns
+
+        if not result:
+            stats.rejections += 1
+
+    def is_due(self) -> bool:
+        self._routes += 1
+
+        return self._routes % self.interval == 0
+
+    def _get_rank(self, filter_: FilterProtocol) -> float:
+        stats = self.stats.get(filter_, None)
+
+        if stats is None:
+            return float("inf")
+
+        return stats.rank
+
+    def order(self, filters: list[FilterProtocol]) -> list[FilterProtocol]:
+        result = []
+        movable = []
+
+        for filter_ in filters:
+            if not getattr(filter_, "pinned", False):
+                movable.append(filter_)
+                continue
+
+            result.extend(sorted(movable, key=self._get_rank))
+            result.append(filter_)
+
+            movable = []
+
+        result.extend(sorted(movable, key=self._get_rank))
+
+        return result
@@ -0,0 +1,344 @@
+from typing import Any, Callable, Hashable, Iterator, Optional, TYPE_CHECKING
+from inspect import isawaitable
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from silvanus.structures.base import (
+    RoutingData,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterSchema,
+    RouterProtocol
+)
+
+from silvanus.strategy.routers.base import RouterIteratorProtocol
+
+from .simple import SimpleRouter, resolve_sync
+from .metrics import RoutingMetrics
+
+if TYPE_CHECKING:
+    from .offload import ProcessFilterPool, BlockingPool
+
+
+__all__ = ["CachedRouter", ]
+
+
+CacheKeyType = Callable[[RoutingData], Optional[Hashable]]
+
+
+class _RecordedSet(set):
+    """
+    Writes the middlewares that were run into the log of a routing call
+    """
+
+    __slots__ = ("log", "inner")
+
+    def __init__(self, items: set, log: list[tuple[bool, Any]], inner: bool):
+        super().__init__(items)
+
+        self.log = log
+        self.inner = inner
+
+    def add(self, item: Any):
+        if not self.inner and item not in self:
+            self.log.append((False, item))
+
+        super().add(item)
+
+    def __iter__(self):
+        if self.inner:
+            self.log.append((True, tuple(super().__iter__())))
+
+        return super().__iter__()
+
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class _CacheEntry:
+    result: Any
+    nothing: bool
+
+    filters_data: tuple[tuple[str, Any], ...]
+    used_filters: tuple[tuple[FilterProtocol, Any], ...]
+    inner_middlewares: tuple[MiddlewareProtocol, ...]
+
+    # the results added to the per-call state of the parent walk, see
+    # RouterIteratorProtocol
+    added: tuple[Any, ...]
+
+    # (False, middleware) for a middleware, (True, inner middlewares) for
+    # a pass over the inner middlewares, in the order they were run
+    log: tuple[tuple[bool, Any], ...]
+
+
+class CachedRouter:
+    """
+    LRU cache of routing results in front of a router. The key function
+    gets the routing data and returns the cache key (for example the method
+    and the path), or None if the data must not be cached. The result
+    must depend only on the key and the iterator: its type, or its
+    cache_key attribute if it has one (e.g. the type and the count of
+    FirstNTrueRouterIterator).
+
+    On a hit, the filters are not called: the captured filters_data and
+    used_filters are restored and the middlewares that were run on the miss
+    are run again, in the same order. The cache is cleared after any add_*
+    call in the subtree of the router (see SimpleRouter.version).
+
+    Below another router, the results the subtree added to the results of
+    the parent walk are cached too. Under a limited iterator (see
+    FirstNTrueRouterIterator) the cache is bypassed there, the added
+    results depend on the results before. It is bypassed below
+    ParallelAllTrueRouterIterator too: the middlewares are recorded in
+    the routing data, which is shared by the concurrent branches. And
+    below BestFirstRouterIterator, the routers only report to the search
+    that they passed.
+    """
+
+    __slots__ = (
+        "router",
+        "key",
+        "maxsize",
+        "hits",
+        "misses",
+        "_cache",
+        "_version"
+    )
+
+    def __init__(self, router: RouterProtocol, key: CacheKeyType, maxsize: int = 1024):
+        self.router = router
+        self.key = key
+        self.maxsize = maxsize
+
+        self.hits = 0
+        self.misses = 0
+
+        self._cache: OrderedDict[tuple[Hashable, Hashable], _CacheEntry] = OrderedDict()
+        self._version = self.version
+
+    @property
+    def name(self) -> str:
+        return self.router.name
+
+    @property
+    def version(self) -> int:
+        return getattr(self.router, "version", 0)
+
+    def _add_parent(self, parent: SimpleRouter):
+        add_parent = getattr(self.router, "_add_parent", None)
+
+        if add_parent is not None:
+            add_parent(parent)
+
+    def add_filter(self, filter_: FilterProtocol):
+        self.router.add_filter(filter_)
+
+    def add_middleware(self, middleware: MiddlewareProtocol, inner: bool = False):
+        self.router.add_middleware(middleware, inner=inner)
+
+    def add_router(self, router: "RouterProtocol"):
+        self.router.add_router(router)
+
+    def add_routers(self, routers: list["RouterProtocol"]):
+        self.router.add_routers(routers)
+
+    def get_routers_schema(self, with_parents: bool = False) -> RouterSchema:
+        return self.router.get_routers_schema(with_parents=with_parents)
+
+    def set_metrics(self, metrics: Optional[RoutingMetrics], recursive: bool = True):
+        set_metrics = getattr(self.router, "set_metrics", None)
+
+        if set_metrics is not None:
+            set_metrics(metrics, recursive=recursive)
+
+    def set_cpu_pool(self, pool: Optional["ProcessFilterPool"], recursive: bool = True):
+        set_cpu_pool = getattr(self.router, "set_cpu_pool", None)
+
+        if set_cpu_pool is not None:
+            set_cpu_pool(pool, recursive=recursive)
+
+    def set_blocking_pool(self, pool: Optional["BlockingPool"], recursive: bool = True):
+        set_blocking_pool = getattr(self.router, "set_blocking_pool", None)
+
+        if set_blocking_pool is not None:
+            set_blocking_pool(pool, recursive=recursive)
+
+    def clear(self):
+        self._cache.clear()
+
+    def _get(self, key: tuple[Hashable, Hashable]) -> Optional[_CacheEntry]:
+        version = self.version
+
+        if self._version != version:
+            self._cache.clear()
+            self._version = version
+
+        entry = self._cache.get(key, None)
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._cache.move_to_end(key)
+        self.hits += 1
+
+        return entry
+
+    def _put(self, key: tuple[Hashable, Hashable], entry: _CacheEntry):
+        self._cache[key] = entry
+
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+
+    @staticmethod
+    def _get_iterator_key(iterator: RouterIteratorProtocol) -> Hashable:
+        return getattr(iterator, "cache_key", None) or type(iterator)
+
+    @staticmethod
+    def _is_cacheable(iterator: RouterIteratorProtocol) -> bool:
+        if not getattr(iterator, "cacheable", True):
+            return False
+
+        return getattr(iterator, "returned", None) is None or getattr(iterator, "max_results", None) is None
+
+    @staticmethod
+    def _start_recording(
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> tuple[list[tuple[bool, Any]], dict, dict, int]:
+        log = []
+
+        data.used_middlewares = _RecordedSet(data.used_middlewares, log, inner=False)
+        data.inner_middlewares = _RecordedSet(data.inner_middlewares, log, inner=True)
+
+        returned = getattr(iterator, "returned", None)
+
+        return log, dict(data.filters_data), dict(data.used_filters), len(returned or ())
+
+    @staticmethod
+    def _stop_recording(
+            data: RoutingData,
+            iterator: RouterIteratorProtocol,
+            result: Any,
+            recording: tuple[list[tuple[bool, Any]], dict, dict, int]
+    ) -> _CacheEntry:
+        log, filters_data, used_filters, started = recording
+        returned = getattr(iterator, "returned", None)
+
+        return _CacheEntry(
+            result=result,
+            nothing=result is iterator.on_nothing,
+            filters_data=tuple(
+                (name, value) for name, value in data.filters_data.items()
+                if name not in filters_data or filters_data[name] is not value
+            ),
+            used_filters=tuple(
+                (filter_, value) for filter_, value in data.used_filters.items()
+                if filter_ not in used_filters
+            ),
+            inner_middlewares=tuple(set.__iter__(data.inner_middlewares)),
+            added=tuple(returned[started:]) if returned is not None else (),
+            log=tuple(log)
+        )
+
+    @staticmethod
+    def _restore(data: RoutingData):
+        data.used_middlewares = set(set.__iter__(data.used_middlewares))
+        data.inner_middlewares = set(set.__iter__(data.inner_middlewares))
+
+    @staticmethod
+    def _replay(entry: _CacheEntry, data: RoutingData) -> Iterator[MiddlewareProtocol]:
+        data.filters_data.update(entry.filters_data)
+        data.used_filters.update(entry.used_filters)
+        data.inner_middlewares.update(entry.inner_middlewares)
+
+        for inner, items in entry.log:
+            if inner:
+                yield from items
+
+            elif items not in data.used_middlewares:
+                data.used_middlewares.add(items)
+                yield items
+
+    @staticmethod
+    def _get_result(entry: _CacheEntry, iterator: RouterIteratorProtocol) -> Any:
+        if entry.added:
+            iterator.returned.extend(entry.added)
+
+        if entry.nothing:
+            return iterator.on_nothing
+
+        if type(entry.result) is list:
+            return list(entry.result)
+
+        return entry.result
+
+    async def route(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        key = self.key(data)
+
+        if key is None or not self._is_cacheable(iterator):
+            return await self.router.route(data, iterator)
+
+        key = (self._get_iterator_key(iterator), key)
+        entry = self._get(key)
+
+        if entry is not None:
+            blocking_pool = getattr(self.router, "blocking_pool", None)
+
+            for middleware in self._replay(entry, data):
+                if blocking_pool is None:
+                    middleware_result = middleware(data)
+
+                else:
+                    middleware_result = blocking_pool.call(middleware, data)
+
+                if middleware_result is not None and isawaitable(middleware_result):
+                    await middleware_result
+
+            return self._get_result(entry, iterator)
+
+        recording = self._start_recording(data, iterator)
+
+        try:
+            result = await self.router.route(data, iterator)
+
+        finally:
+            self._restore(data)
+
+        self._put(key, self._stop_recording(data, iterator, result, recording))
+
+        return result
+
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        key = self.key(data)
+
+        if key is None or not self._is_cacheable(iterator):
+            return self.router.route_sync(data, iterator)
+
+        key = (self._get_iterator_key(iterator), key)
+        entry = self._get(key)
+
+        if entry is not None:
+            for middleware in self._replay(entry, data):
+                resolve_sync(middleware(data))
+
+            return self._get_result(entry, iterator)
+
+        recording = self._start_recording(data, iterator)
+
+        try:
+            result = self.router.route_sync(data, iterator)
+
+        finally:
+            self._restore(data)
+
+        self._put(key, self._stop_recording(data, iterator, result, recording))
+
+        return result
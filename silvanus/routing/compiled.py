@@ -0,0 +1,312 @@
+from typing import Any, Awaitable, Generator, Optional
+from inspect import isawaitable
+from dataclasses import dataclass
+
+from silvanus.structures.base import (
+    RoutingData,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterProtocol,
+    SYNC_FILTER_RESULTS
+)
+
+from silvanus.structures.memo import filter_registry, FAILED, PASSED
+from silvanus.strategy.routers.base import RouterIteratorProtocol
+
+from .simple import SimpleRouter, resolve_sync
+
+
+__all__ = ["PlanNode", "CompiledRouter"]
+
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class PlanNode:
+    middlewares: tuple[MiddlewareProtocol, ...]
+    filters: tuple[FilterProtocol, ...]
+    # the ids of the filters in the same order, see FilterMemo
+    filter_ids: tuple[int, ...]
+    filter_bound: int
+    inner_middlewares: tuple[MiddlewareProtocol, ...]
+    data: Any
+
+    end: int
+    router: Optional[RouterProtocol] = None
+
+    def __del__(self):
+        # the ids are registered by _make_node
+        filter_registry.release_later(self.filter_ids)
+
+    def __reduce__(self):
+        # the filter ids are only valid in the current process, they are
+        # registered again when the node is unpickled
+        return (
+            _make_node,
+            (self.middlewares, self.filters, self.inner_middlewares, self.data, self.end, self.router)
+        )
+
+
+def _make_node(
+        middlewares: tuple[MiddlewareProtocol, ...],
+        filters: tuple[FilterProtocol, ...],
+        inner_middlewares: tuple[MiddlewareProtocol, ...],
+        data: Any,
+        end: int,
+        router: Optional[RouterProtocol] = None
+) -> PlanNode:
+    filter_ids = filter_registry.register_many(filters)
+
+    return PlanNode(
+        middlewares=middlewares,
+        filters=filters,
+        filter_ids=filter_ids,
+        filter_bound=max(filter_ids, default=-1) + 1,
+        inner_middlewares=inner_middlewares,
+        data=data,
+        end=end,
+        router=router
+    )
+
+
+class CompiledRouter:
+    """
+    Immutable dispatch plan of a finished SimpleRouter tree. The routers are
+    laid out in the order the iterators visit them, every node knows where
+    its subtree ends, so routing is a single loop over the plan instead of
+    a recursion through router.route and iterator.__call__. Filters and
+    middlewares that are already guaranteed by an ancestor are dropped
+    from the nodes at compile time.
+
+    Routers that are not plain SimpleRouters are kept as single nodes and
+    routed with their own route method.
+    """
+
+    __slots__ = (
+        "name",
+        "nodes"
+    )
+
+    def __init__(self, router: RouterProtocol):
+        self.name = router.name
+
+        nodes: list[PlanNode] = []
+        self._compile(router, nodes, (), (), set())
+
+        self.nodes = tuple(nodes)
+
+    @classmethod
+    def _compile(
+            cls,
+            router: RouterProtocol,
+            nodes: list[PlanNode],
+            used_filters: tuple[FilterProtocol, ...],
+            used_middlewares: tuple[MiddlewareProtocol, ...],
+            path: set[int]
+    ):
+        if id(router) in path:
+            raise ValueError(f"router {router.name!r} is nested in itself")
+
+        index = len(nodes)
+
+        if not isinstance(router, SimpleRouter) or type(router).select_routers is not SimpleRouter.select_routers:
+            nodes.append(_make_node((), (), (), None, index + 1, router))
+            return
+
+        middlewares = tuple(
+            middleware for middleware in router.middlewares
+            if middleware not in used_middlewares
+        )
+        filters = tuple(
+            filter_ for filter_ in router.filters
+            if filter_ not in used_filters
+        )
+
+        nodes.append(None)  # the node is replaced when the end of the subtree is known
+
+        path.add(id(router))
+
+        for child in router.routers:
+            cls._compile(
+                child,
+                nodes,
+                used_filters + filters,
+                used_middlewares + middlewares,
+                path
+            )
+
+        path.remove(id(router))
+
+        nodes[index] = _make_node(
+            middlewares,
+            filters,
+            tuple(router.inner_middlewares),
+            router.data,
+            len(nodes)
+        )
+
+    @staticmethod
+    def _enter(node: PlanNode, data: RoutingData) -> Generator[Awaitable, Any, bool]:
+        for middleware in node.middlewares:
+            if middleware not in data.used_middlewares:
+                middleware_result = middleware(data)
+
+                if middleware_result is not None and isawaitable(middleware_result):
+                    yield middleware_result
+
+                data.used_middlewares.add(middleware)
+
+        results = data.used_filters.reserve(node.filter_bound)
+
+        for self_filter, filter_id in zip(node.filters, node.filter_ids):
+            memoized = results[filter_id]
+
+            if memoized:
+                if memoized == FAILED:
+                    return False
+
+                continue
+
+            filter_result = self_filter(data)
+
+            if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                filter_result = yield filter_result
+
+            if not filter_result:
+                results[filter_id] = FAILED
+                return False
+
+            results[filter_id] = PASSED
+
+        for inner in node.inner_middlewares:
+            data.inner_middlewares.add(inner)
+
+        return True
+
+    @staticmethod
+    def _leave(data: RoutingData, times: int) -> Generator[Awaitable, Any, None]:
+        for _ in range(times):
+            for inner in tuple(data._inner_middlewares or ()):
+                inner_result = inner(data)
+
+                if inner_result is not None and isawaitable(inner_result):
+                    yield inner_result
+
+    def _walk(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol,
+            sync: bool
+    ) -> Generator[Awaitable, Any, Any]:
+        """
+        Walks the plan and yields every awaitable it meets, the driver
+        (route or route_sync) sends the results back
+        """
+        find_all = getattr(iterator, "find_all", None)
+
+        if find_all is None:
+            raise TypeError(f"{type(iterator).__name__} is not supported by {type(self).__name__}")
+
+        # the maximum number of results when all are searched
+        limit: Optional[int] = getattr(iterator, "max_results", None)
+
+        # the per-call state of a parent walk collects the results itself,
+        # see RouterIteratorProtocol
+        returned: Optional[list[Any]] = getattr(iterator, "returned", None)
+        nested = returned is not None
+
+        if not nested:
+            returned = []
+
+        nodes = self.nodes
+        opened: list[int] = []
+
+        entered = False
+
+        index = 0
+
+        while index < len(nodes):
+            node = nodes[index]
+
+            if node.router is not None:
+                if sync:
+                    result = node.router.route_sync(data, iterator)
+
+                else:
+                    result = yield node.router.route(data, iterator)
+
+                if result is not iterator.on_nothing:
+                    entered = True
+
+                    if not find_all:
+                        yield from self._leave(data, len(opened))
+                        return result
+
+                    returned.extend(result)
+
+                if limit is not None and len(returned) >= limit:
+                    del returned[limit:]
+
+                    yield from self._leave(data, len(opened))
+                    return iterator.on_nothing if nested else returned
+
+                index = node.end
+
+            elif not (yield from self._enter(node, data)):
+                index = node.end
+
+            else:
+                entered = True
+
+                if node.data:
+                    if not find_all:
+                        yield from self._leave(data, len(opened) + 1)
+                        return node.data
+
+                    returned.append(node.data)
+
+                    if limit is not None and len(returned) >= limit:
+                        yield from self._leave(data, len(opened) + 1)
+                        return iterator.on_nothing if nested else returned
+
+                opened.append(node.end)
+                index += 1
+
+            while opened and opened[-1] <= index:
+                opened.pop()
+                yield from self._leave(data, 1)
+
+        if nested or not entered or not find_all:
+            return iterator.on_nothing
+
+        return returned
+
+    async def route(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        walk = self._walk(data, iterator, sync=False)
+
+        try:
+            awaitable = next(walk)
+
+            while True:
+                awaitable = walk.send(await awaitable)
+
+        except StopIteration as stop:
+            return stop.value
+
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        walk = self._walk(data, iterator, sync=True)
+
+        try:
+            awaitable = next(walk)
+
+            while True:
+                awaitable = walk.send(resolve_sync(awaitable))
+
+        except StopIteration as stop:
+            return stop.value
@@ -0,0 +1,157 @@
+from typing import Any
+from bisect import bisect_left
+
+from silvanus.structures.base import FilterProtocol, MiddlewareProtocol
+
+
+__all__ = ["Histogram", "CallMetrics", "RoutingMetrics"]
+
+
+# upper bounds of the latency buckets, in nanoseconds
+LATENCY_BUCKETS: tuple[int, ...] = (
+    1_000, 2_000, 5_000,
+    10_000, 20_000, 50_000,
+    100_000, 200_000, 500_000,
+    1_000_000, 2_000_000, 5_000_000,
+    10_000_000, 20_000_000, 50_000_000,
+    100_000_000, 1_000_000_000
+)
+
+
+class Histogram:
+    __slots__ = (
+        "counts",
+        "count",
+        "total_ns"
+    )
+
+    def __init__(self):
+        # the last bucket is for the values above the last bound
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total_ns = 0
+
+    def add(self, ns: int):
+        self.counts[bisect_left(LATENCY_BUCKETS, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "total_ns": self.total_ns,
+            "buckets": [
+                [bound, count]
+                for bound, count in zip(LATENCY_BUCKETS + (None, ), self.counts)
+            ]
+        }
+
+
+class CallMetrics:
+    __slots__ = (
+        "calls",
+        "passed",
+        "failed",
+        "memo_hits",
+        "latency"
+    )
+
+    def __init__(self):
+        self.calls = 0
+        self.passed = 0
+        self.failed = 0
+        self.memo_hits = 0
+        self.latency = Histogram()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "passed": self.passed,
+            "failed": self.failed,
+            "memo_hits": self.memo_hits,
+            "latency": self.latency.snapshot()
+        }
+
+
+class RoutingMetrics:
+    """
+    Collects call counts, pass/fail counts, used_filters memo hits and latency
+    histograms of the filters, middlewares and routers (by their name).
+    Attach it to a tree with SimpleRouter.set_metrics, the routers without
+    metrics don't measure anything.
+    """
+
+    __slots__ = (
+        "routers",
+        "filters",
+        "middlewares"
+    )
+
+    def __init__(self):
+        self.routers: dict[str, CallMetrics] = {}
+        self.filters: dict[FilterProtocol, CallMetrics] = {}
+        self.middlewares: dict[MiddlewareProtocol, CallMetrics] = {}
+
+    @staticmethod
+    def _get(collection: dict[Any, CallMetrics], key: Any) -> CallMetrics:
+        metrics = collection.get(key, None)
+
+        if metrics is None:
+            metrics = collection[key] = CallMetrics()
+
+        return metrics
+
+    def record_router(self, name: str, ns: int, passed: bool):
+        metrics = self._get(self.routers, name)
+
+        metrics.calls += 1
+        metrics.latency.add(ns)
+
+        if passed:
+            metrics.passed += 1
+
+        else:
+            metrics.failed += 1
+
+    def record_filter(self, filter_: FilterProtocol, ns: int, result: Any):
+        metrics = self._get(self.filters, filter_)
+
+        metrics.calls += 1
+        metrics.latency.add(ns)
+
+        if result:
+            metrics.passed += 1
+
+        else:
+            metrics.failed += 1
+
+    def record_memo_hit(self, filter_: FilterProtocol):
+        self._get(self.filters, filter_).memo_hits += 1
+
+    def record_middleware(self, middleware: MiddlewareProtocol, ns: int):
+        metrics = self._get(self.middlewares, middleware)
+
+        metrics.calls += 1
+        metrics.latency.add(ns)
+
+    def reset(self):
+        self.routers.clear()
+        self.filters.clear()
+        self.middlewares.clear()
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        """
+        Returns the collected metrics as plain dicts and lists, ready to be
+        exported as json. The filters and middlewares are keyed by repr
+        """
+        return {
+            "routers": {
+                name: metrics.snapshot() for name, metrics in self.routers.items()
+            },
+            "filters": {
+                repr(filter_): metrics.snapshot() for filter_, metrics in self.filters.items()
+            },
+            "middlewares": {
+                repr(middleware): metrics.snapshot() for middleware, metrics in self.middlewares.items()
+            }
+        }
@@ -0,0 +1,191 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait as wait_all
+from multiprocessing.context import BaseContext
+
+from silvanus.structures.base import RoutingData, FilterProtocol, MiddlewareProtocol
+
+from .simple import resolve_sync
+
+
+__all__ = ["ProcessFilterPool", "BlockingPool"]
+
+
+def _run_filter(filter_: FilterProtocol, request_data: dict[str, Any]) -> bool:
+    return bool(resolve_sync(filter_(RoutingData(request_data=request_data))))
+
+
+def _run_blocking(callable_: FilterProtocol | MiddlewareProtocol, data: RoutingData) -> Any:
+    return resolve_sync(callable_(data))
+
+
+def _warm_up():
+    return None
+
+
+class ProcessFilterPool:
+    """
+    A managed ProcessPoolExecutor for the filters with a true "cpu_bound"
+    attribute (see CpuBoundFilterProtocol), attach it with
+    SimpleRouter.set_cpu_pool. The pool is started on the first use or by
+    start, and must be shut down by the owner (or used as a context
+    manager).
+    """
+
+    __slots__ = (
+        "max_workers",
+        "warmup",
+        "mp_context",
+        "initializer",
+        "initargs",
+        "_executor"
+    )
+
+    def __init__(
+            self,
+            max_workers: Optional[int] = None,
+            warmup: bool = False,
+            mp_context: Optional[BaseContext] = None,
+            initializer: Optional[Callable[..., Any]] = None,
+            initargs: tuple[Any, ...] = ()
+    ):
+        """
+        :param max_workers: the number of processes, the number of CPUs if
+        None
+        :param warmup: if True, start waits until all the processes are
+        running, so the first requests don't pay for their start
+        :param mp_context: see ProcessPoolExecutor
+        :param initializer: called in every process when it starts, e.g.
+        to import heavy modules or load keys
+        :param initargs: the arguments of initializer
+        """
+        self.max_workers = max_workers
+        self.warmup = warmup
+        self.mp_context = mp_context
+        self.initializer = initializer
+        self.initargs = initargs
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> ProcessPoolExecutor:
+        if self._executor is not None:
+            return self._executor
+
+        executor = self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=self.mp_context,
+            initializer=self.initializer,
+            initargs=self.initargs
+        )
+
+        if self.warmup:
+            # the processes are started on demand, one for every task that
+            # finds no idle process
+            wait_all([executor.submit(_warm_up) for _ in range(executor._max_workers)])
+
+        return executor
+
+    def run(self, filter_: FilterProtocol, data: RoutingData) -> asyncio.Future:
+        """
+        Runs the filter in the pool
+        :param filter_:
+        :param data:
+        :return: a future with the result of the filter as a bool
+        """
+        keys = getattr(filter_, "request_keys", None)
+        request_data = data.request_data
+
+        if keys is not None:
+            request_data = {key: request_data[key] for key in keys if key in request_data}
+
+        return asyncio.get_running_loop().run_in_executor(self.start(), _run_filter, filter_, request_data)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=wait)
+        self._executor = None
+
+    def __enter__(self) -> "ProcessFilterPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+
+class BlockingPool:
+    """
+    A thread pool for the filters and middlewares with a true "blocking"
+    attribute (e.g. the ones that use a sync database client), attach it
+    with SimpleRouter.set_blocking_pool. The marked callables get the
+    routing data as usual, so they must not touch it from other threads
+    at the same time. The pool is started on the first use and must be
+    shut down by the owner (or used as a context manager).
+    """
+
+    __slots__ = (
+        "max_workers",
+        "timeout",
+        "_executor"
+    )
+
+    def __init__(self, max_workers: Optional[int] = None, timeout: Optional[float] = None):
+        """
+        :param max_workers: the maximum number of callables running at the
+        same time, the others wait in the queue. See ThreadPoolExecutor for
+        the default
+        :param timeout: the seconds a call may take, with the time in the
+        queue. TimeoutError is raised when it is exceeded, the thread is not
+        stopped, but its result is ignored. None for no timeout
+        """
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def start(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="silvanus")
+
+        return self._executor
+
+    async def run(self, callable_: FilterProtocol | MiddlewareProtocol, data: RoutingData) -> Any:
+        """
+        Runs the filter or the middleware in the pool
+        :param callable_:
+        :param data:
+        :return: the result of the callable
+        """
+        future = asyncio.get_running_loop().run_in_executor(self.start(), _run_blocking, callable_, data)
+
+        if self.timeout is None:
+            return await future
+
+        return await asyncio.wait_for(future, self.timeout)
+
+    def call(self, callable_: FilterProtocol | MiddlewareProtocol, data: RoutingData) -> Optional[Awaitable[Any]]:
+        """
+        Runs the callable in the pool if it is marked as blocking, otherwise
+        calls it in place
+        """
+        if getattr(callable_, "blocking", False):
+            return self.run(callable_, data)
+
+        return callable_(data)
+
+    def shutdown(self, wait: bool = True):
+        if self._executor is None:
+            return
+
+        self._executor.shutdown(wait=wait)
+        self._executor = None
+
+    def __enter__(self) -> "BlockingPool":
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
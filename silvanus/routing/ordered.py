@@ -0,0 +1,53 @@
+from typing import Any
+
+from silvanus.structures.base import RouterProtocol
+
+from .simple import SimpleRouter
+
+
+__all__ = ["OrderedRouter", ]
+
+
+class OrderedRouter(SimpleRouter):
+    """
+    The base of the routers that keep their children in a lookup structure
+    of their own (TrieRouter, RegexRouter, EventRouter). Every child gets
+    its position in the registration order, select_routers keeps it when
+    the looked up children are merged with the routers added with
+    add_router, which are passed for every request.
+    """
+
+    __slots__ = (
+        "_always",
+        "_order"
+    )
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+
+        self._always: list[tuple[int, RouterProtocol]] = []
+        self._order = 0
+
+    def _add_child(self, router: "RouterProtocol") -> int:
+        """
+        Adds the router to the children and returns its position, the
+        caller stores it in its lookup structure and calls _children_changed
+        """
+        order = self._order
+        self._order += 1
+
+        self.routers.append(router)
+        self._link(router)
+
+        return order
+
+    def _children_changed(self):
+        self._changed()
+
+    def add_router(self, router: "RouterProtocol"):
+        self._always.append((self._add_child(router), router))
+        self._children_changed()
+
+    def add_routers(self, routers: list["RouterProtocol"]):
+        for router in routers:
+            self.add_router(router)
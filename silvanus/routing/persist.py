@@ -0,0 +1,137 @@
+import os
+import sys
+import pickle
+import hashlib
+import tempfile
+
+from typing import Any, Iterable, Optional
+from os import PathLike
+from importlib.metadata import version, PackageNotFoundError
+
+from silvanus.structures.base import RouterProtocol
+
+from .compiled import CompiledRouter
+
+
+__all__ = ["get_fingerprint", "dump_router", "load_router"]
+
+
+# changed when the layout of the file or of the plan changes
+FORMAT = 1
+
+
+def _get_silvanus_version() -> str:
+    try:
+        return version("silvanus")
+
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def _normalize(value: Any) -> Any:
+    if value is None or isinstance(value, (str, int, float, bool, bytes)):
+        return value
+
+    if isinstance(value, (list, tuple)):
+        return [_normalize(item) for item in value]
+
+    if isinstance(value, dict):
+        return sorted(([_normalize(key), _normalize(item)] for key, item in value.items()), key=repr)
+
+    if isinstance(value, (set, frozenset)):
+        return sorted((_normalize(item) for item in value), key=repr)
+
+    qualname = getattr(value, "__qualname__", None)
+
+    if qualname is not None:
+        return f"{value.__module__}:{qualname}"
+
+    raise TypeError(f"{value!r} can't be fingerprinted, use plain values or importable objects")
+
+
+def get_fingerprint(registrations: Iterable[Any]) -> str:
+    """
+    Returns a fingerprint of the route registrations, e.g. the
+    (path, method, handler) of every route. Functions and classes are
+    described by their import path, so the fingerprint is the same in
+    every process. The versions of python and silvanus are included too
+    :param registrations: plain values (str, int, lists, dicts, ...),
+    functions and classes
+    :return:
+    """
+    normalized = [
+        FORMAT,
+        sys.version_info[:2],
+        _get_silvanus_version(),
+        [_normalize(registration) for registration in registrations]
+    ]
+
+    return hashlib.sha256(repr(normalized).encode()).hexdigest()
+
+
+def dump_router(router: RouterProtocol | CompiledRouter, path: str | PathLike, fingerprint: str):
+    """
+    Compiles the router (if it is not compiled yet) and writes the plan to
+    the file. The filters, middlewares and the data of the routers are
+    pickled: functions and classes are stored by their import path, so
+    they must be importable (no lambdas or local functions). The plan is
+    written to a temporary file that replaces the old one, so a process
+    loading it at the same time never sees a partial file
+    :param router:
+    :param path:
+    :param fingerprint: see get_fingerprint
+    :return:
+    """
+    if not isinstance(router, CompiledRouter):
+        router = CompiledRouter(router)
+
+    descriptor, temporary = tempfile.mkstemp(
+        dir=os.path.dirname(os.path.abspath(path)),
+        prefix=f".{os.path.basename(path)}.",
+        suffix=".tmp"
+    )
+
+    try:
+        with os.fdopen(descriptor, "wb") as file:
+            pickle.dump({"format": FORMAT, "fingerprint": fingerprint}, file)
+            pickle.dump(router, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+        os.replace(temporary, path)
+
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def load_router(path: str | PathLike, fingerprint: str) -> Optional[CompiledRouter]:
+    """
+    Loads the plan written by dump_router. Returns None if the file doesn't
+    exist, was written for other registrations or can't be read (it is
+    truncated, or the pickled objects were moved or removed), then the
+    tree must be built and dumped again. Load only the files you wrote yourself,
+    unpickling can run any code
+    :param path:
+    :param fingerprint: see get_fingerprint
+    :return:
+    """
+    try:
+        file = open(path, "rb")
+
+    except FileNotFoundError:
+        return None
+
+    with file:
+        try:
+            header = pickle.load(file)
+
+            if (
+                    not isinstance(header, dict)
+                    or header.get("format") != FORMAT
+                    or header.get("fingerprint") != fingerprint
+            ):
+                return None
+
+            return pickle.load(file)
+
+        except (EOFError, pickle.UnpicklingError, ImportError, AttributeError):
+            return None
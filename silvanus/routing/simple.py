@@ -1,28 +1,145 @@
-from typing import Any, Optional
+import math
+import asyncio
+import weakref
+
+from time import perf_counter_ns
+from typing import Any, Optional, TYPE_CHECKING
+from inspect import isawaitable
 
 from silvanus.structures.base import (
     RoutingData,
     FilterProtocol,
     MiddlewareProtocol,
     RouterSchema,
-    RouterProtocol
+    RouterProtocol,
+    SYNC_FILTER_RESULTS
 )
 
 from silvanus.strategy.routers.base import RouterIteratorProtocol
 
+from silvanus.structures.memo import filter_registry, FAILED, PASSED
+
+from .adaptive import FilterProfile
+from .metrics import RoutingMetrics
+
+if TYPE_CHECKING:
+    from .compiled import CompiledRouter
+    from .offload import ProcessFilterPool, BlockingPool
+
+
+__all__ = ["SimpleRouter", "resolve_sync"]
+
+
+_MISSING = object()
+
+
+def resolve_sync(result: Any) -> Any:
+    """
+    Returns the result of a filter or a middleware without an event loop.
+    Awaitables are driven by hand, so coroutines that finish without
+    suspending (pure CPU filters written as async def) are supported.
+    :param result: the value returned by the filter or the middleware
+    :return:
+    """
+    if not isawaitable(result):
+        return result
+
+    awaitable = result.__await__()
+
+    try:
+        awaitable.send(None)
+
+    except StopIteration as stop:
+        return stop.value
+
+    awaitable.close()
+
+    raise RuntimeError(
+        f"{result!r} is suspended waiting for the event loop, use route instead of route_sync"
+    )
+
 
-__all__ = ["SimpleRouter", ]
+def _notify(name: str):
+    method = getattr(list, name)
+
+    def changing(self: "_FilterList", *args: Any, **kwargs: Any) -> Any:
+        result = method(self, *args, **kwargs)
+        self._changed()
+
+        return result
+
+    changing.__name__ = name
+
+    return changing
+
+
+class _FilterList(list):
+    """
+    The filters of a SimpleRouter, the router registers them again after
+    every change of the list
+    """
+
+    __slots__ = ("_owner", )
+
+    def __init__(self, owner: "SimpleRouter", filters: Any = ()):
+        super().__init__(filters)
+
+        # not a strong reference, the router releases its ids in __del__
+        self._owner = weakref.ref(owner)
+
+    def _changed(self):
+        owner = self._owner()
+
+        if owner is not None and owner._filters is self:
+            owner._filters_changed()
+
+    def __reduce__(self) -> tuple:
+        return list, (list(self), )
+
+
+for _name in (
+        "append",
+        "extend",
+        "insert",
+        "remove",
+        "pop",
+        "clear",
+        "sort",
+        "reverse",
+        "__setitem__",
+        "__delitem__",
+        "__iadd__",
+        "__imul__"
+):
+    setattr(_FilterList, _name, _notify(_name))
 
 
 class SimpleRouter:
     __slots__ = (
+        "__weakref__",
         "name",
         "data",
         "routers",
-        "filters",
+        "_filters",
         "parent",
         "middlewares",
-        "inner_middlewares"
+        "inner_middlewares",
+        "index_key",
+        "concurrent_filters",
+        "filter_profile",
+        "metrics",
+        "cpu_pool",
+        "blocking_pool",
+        "_priority",
+        "_priority_bound",
+        "_priority_version",
+        "_filter_ids",
+        "_filter_bound",
+        "_index",
+        "_index_version",
+        "_concurrent",
+        "_version",
+        "_parents"
     )
 
     def __init__(
@@ -32,8 +149,29 @@ class SimpleRouter:
             inner_middlewares: Optional[list[MiddlewareProtocol]] = None,
             data: Any = None,
             parent: Optional["RouterProtocol"] = None,
-            name: Optional[str] = None
+            name: Optional[str] = None,
+            index_key: Optional[str] = None,
+            concurrent_filters: bool = False,
+            adaptive_interval: Optional[int] = None,
+            priority: float = 0
     ):
+        """
+        :param index_key: if set, the children are grouped by the value of
+        request_data[index_key] declared by their leading indexable filters
+        (see IndexableFilterProtocol), and only the group of the current
+        request is passed to the iterator. The value is read once, when the
+        router is entered. Children with middlewares are always passed. The
+        index is rebuilt after any add_* call in the subtree (see version)
+        :param concurrent_filters: if True, all the filters of the router are
+        awaited concurrently. Otherwise only the filters with a true
+        "concurrent" attribute are, in groups of neighbouring filters. As soon
+        as one filter of a group returns False, the rest are cancelled
+        :param adaptive_interval: if set, the router measures the cost and the
+        rejection rate of its filters and reorders them every
+        adaptive_interval routing calls, see FilterProfile
+        :param priority: the priority of the data of the router, higher is
+        better, see BestFirstRouterIterator
+        """
         if not name:
             name = f"{__name__}"
 
@@ -50,15 +188,207 @@ class SimpleRouter:
         if not inner_middlewares:
             inner_middlewares = []
 
-        self.filters = filters
+        # a copy, the changes of the list must be seen by the router
+        self._filters = _FilterList(self, filters)
+        self._register_filters()
+
         self.middlewares = middlewares
         self.inner_middlewares = inner_middlewares
         self.parent = parent
 
+        self.index_key = index_key
+        self._index: Optional[tuple[dict[Any, list[RouterProtocol]], list[RouterProtocol]]] = None
+        self._index_version = -1
+
+        self.concurrent_filters = concurrent_filters
+        self.cpu_pool: Optional[ProcessFilterPool] = None
+        self.blocking_pool: Optional[BlockingPool] = None
+        self._update_concurrent()
+
+        self.filter_profile: Optional[FilterProfile] = None
+
+        if adaptive_interval is not None:
+            self.filter_profile = FilterProfile(interval=adaptive_interval)
+
+        self.metrics: Optional[RoutingMetrics] = None
+
+        self._priority = priority
+        self._priority_bound = -math.inf
+        self._priority_version = -1
+
+        self._version = 0
+        # weak references to the routers this one was added to
+        self._parents: Optional[list[weakref.ref]] = None
+
+    @property
+    def version(self) -> int:
+        """
+        Changed by any add_* call (or a change of the filters or the
+        priority) of the router or of any router in its subtree, see
+        CachedRouter
+        """
+        return self._version
+
+    def _changed(self):
+        # the router and everything above it, once each
+        pending = [self]
+        seen = set()
+
+        while pending:
+            router = pending.pop()
+
+            if id(router) in seen:
+                continue
+
+            seen.add(id(router))
+            router._version += 1
+
+            for parent_ref in router._parents or ():
+                parent = parent_ref()
+
+                if parent is not None:
+                    pending.append(parent)
+
+    def _add_parent(self, parent: "SimpleRouter"):
+        if self._parents is None:
+            self._parents = []
+
+        self._parents.append(weakref.ref(parent))
+
+    def _link(self, router: "RouterProtocol"):
+        # routers that wrap a SimpleRouter (CachedRouter, StackRouter) pass
+        # the parent on
+        add_parent = getattr(router, "_add_parent", None)
+
+        if add_parent is not None:
+            add_parent(self)
+
+    def __getstate__(self) -> dict[str, Any]:
+        # the filter ids, the index and the pool are only valid in the
+        # current process
+        skipped = (
+            "__weakref__",
+            "_filters",
+            "cpu_pool",
+            "blocking_pool",
+            "_filter_ids",
+            "_filter_bound",
+            "_index",
+            "_index_version",
+            "_priority_bound",
+            "_priority_version",
+            "_version",
+            "_parents"
+        )
+
+        state = {
+            name: getattr(self, name)
+            for cls in type(self).__mro__
+            for name in getattr(cls, "__slots__", ())
+            if name not in skipped and hasattr(self, name)
+        }
+        state["filters"] = list(self._filters)
+
+        return state
+
+    def __setstate__(self, state: dict[str, Any]):
+        state = dict(state)
+        self._filters = _FilterList(self, state.pop("filters"))
+
+        for name, value in state.items():
+            setattr(self, name, value)
+
+        self._index = None
+        self._index_version = -1
+
+        self._priority_bound = -math.inf
+        self._priority_version = -1
+
+        self._version = 0
+
+        # the children are loaded first, they are linked to the parent here
+        if not hasattr(self, "_parents"):
+            self._parents = None
+
+        for router in self.routers:
+            self._link(router)
+
+        self.cpu_pool = None
+        self.blocking_pool = None
+        self._update_concurrent()
+        self._register_filters()
+
+    @property
+    def filters(self) -> list[FilterProtocol]:
+        """
+        The filters of the router. The changes of the list and a new list
+        are seen by the router, as with add_filter
+        """
+        return self._filters
+
+    @filters.setter
+    def filters(self, filters: list[FilterProtocol]):
+        self._filters = _FilterList(self, filters)
+        self._filters_changed()
+
+    def _filters_changed(self):
+        self._register_filters()
+        self._update_concurrent()
+        self._changed()
+
+    def _reorder_filters(self, filters: list[FilterProtocol]):
+        # the same filters in another order, see FilterProfile
+        self._filters = _FilterList(self, filters)
+        self._register_filters()
+
+    @property
+    def priority(self) -> float:
+        return self._priority
+
+    @priority.setter
+    def priority(self, value: float):
+        self._priority = value
+        self._changed()
+
+    @property
+    def priority_bound(self) -> float:
+        """
+        The highest priority of the routers with data in the subtree, -inf
+        if there are none. Recomputed after any add_* call in the subtree
+        """
+        if self._priority_version != self._version:
+            bound = self._priority if self.data else -math.inf
+
+            for router in self.routers:
+                bound = max(bound, getattr(router, "priority_bound", getattr(router, "priority", 0)))
+
+            self._priority_bound = bound
+            self._priority_version = self._version
+
+        return self._priority_bound
+
+    def _register_filters(self):
+        # the ids of self.filters in the same order, see FilterMemo. The
+        # old ids are released after the new ones are taken, so the ids of
+        # the filters that are still used don't change
+        released = getattr(self, "_filter_ids", ())
+
+        self._filter_ids = filter_registry.register_many(self._filters)
+        self._filter_bound = max(self._filter_ids, default=-1) + 1
+
+        filter_registry.release_many(released)
+
+    def __del__(self):
+        # __init__ or __setstate__ may not have been called
+        filter_registry.release_later(getattr(self, "_filter_ids", ()))
+
     def add_filter(self, filter_: FilterProtocol):
-        self.filters.append(filter_)
+        # registered by the list
+        self._filters.append(filter_)
 
     def add_middleware(self, middleware: MiddlewareProtocol, inner: bool = False):
+        self._changed()
+
         if inner:
             self.inner_middlewares.append(middleware)
             return
@@ -67,46 +397,609 @@ class SimpleRouter:
 
     def add_router(self, router: "RouterProtocol"):
         self.routers.append(router)
+        self._link(router)
+        self._changed()
 
     def add_routers(self, routers: list["RouterProtocol"]):
         self.routers.extend(routers)
 
+        for router in routers:
+            self._link(router)
+
+        self._changed()
+
+    def _update_concurrent(self):
+        # the filters are checked by _check_filters_concurrently if any of
+        # them is concurrent or runs in a pool
+        self._concurrent = self.concurrent_filters or any(
+            getattr(filter_, "concurrent", False)
+            or (self.cpu_pool is not None and getattr(filter_, "cpu_bound", False))
+            or (self.blocking_pool is not None and getattr(filter_, "blocking", False))
+            for filter_ in self._filters
+        )
+
+    def _get_index_value(self, router: "RouterProtocol") -> Any:
+        if getattr(router, "middlewares", None):
+            return _MISSING
+
+        for filter_ in getattr(router, "filters", ()):
+            if not isinstance(getattr(filter_, "index_key", None), str):
+                break
+
+            if filter_.index_key == self.index_key:
+                return filter_.index_value
+
+        return _MISSING
+
+    def _build_index(self) -> tuple[dict[Any, list["RouterProtocol"]], list["RouterProtocol"]]:
+        buckets: dict[Any, list[int]] = {}
+        rest: list[int] = []
+
+        for position, router in enumerate(self.routers):
+            value = self._get_index_value(router)
+
+            if value is _MISSING:
+                rest.append(position)
+                continue
+
+            buckets.setdefault(value, []).append(position)
+
+        return (
+            {
+                value: [self.routers[position] for position in sorted(positions + rest)]
+                for value, positions in buckets.items()
+            },
+            [self.routers[position] for position in rest]
+        )
+
+    def set_metrics(self, metrics: Optional[RoutingMetrics], recursive: bool = True):
+        """
+        Attaches the metrics to the router (and its children), None detaches
+        :param metrics:
+        :param recursive:
+        :return:
+        """
+        self.metrics = metrics
+
+        if not recursive:
+            return
+
+        for router in self.routers:
+            set_metrics = getattr(router, "set_metrics", None)
+
+            if set_metrics is not None:
+                set_metrics(metrics, recursive=True)
+
+    def set_cpu_pool(self, pool: Optional["ProcessFilterPool"], recursive: bool = True):
+        """
+        Attaches the process pool to the router (and its children), the
+        filters with a true "cpu_bound" attribute run in the pool when
+        routed with route or route_many, route_sync calls them in place.
+        None detaches
+        :param pool:
+        :param recursive:
+        :return:
+        """
+        self.cpu_pool = pool
+        self._update_concurrent()
+
+        if not recursive:
+            return
+
+        for router in self.routers:
+            set_cpu_pool = getattr(router, "set_cpu_pool", None)
+
+            if set_cpu_pool is not None:
+                set_cpu_pool(pool, recursive=True)
+
+    def set_blocking_pool(self, pool: Optional["BlockingPool"], recursive: bool = True):
+        """
+        Attaches the thread pool to the router (and its children), the
+        filters and the middlewares with a true "blocking" attribute run in
+        the pool when routed with route or route_many, route_sync calls
+        them in place. None detaches
+        :param pool:
+        :param recursive:
+        :return:
+        """
+        self.blocking_pool = pool
+        self._update_concurrent()
+
+        if not recursive:
+            return
+
+        for router in self.routers:
+            set_blocking_pool = getattr(router, "set_blocking_pool", None)
+
+            if set_blocking_pool is not None:
+                set_blocking_pool(pool, recursive=True)
+
+    def select_routers(self, data: RoutingData) -> list["RouterProtocol"]:
+        if self.index_key is None:
+            return self.routers
+
+        index = self._index
+
+        if index is None or self._index_version != self._version:
+            index = self._index = self._build_index()
+            self._index_version = self._version
+
+        buckets, rest = index
+
+        try:
+            return buckets.get(data.request_data[self.index_key], rest)
+
+        except (KeyError, TypeError):
+            return self.routers
+
+    def _call_filter(self, self_filter: FilterProtocol, data: RoutingData) -> Any:
+        if self.cpu_pool is not None and getattr(self_filter, "cpu_bound", False):
+            return self.cpu_pool.run(self_filter, data)
+
+        if self.blocking_pool is not None:
+            return self.blocking_pool.call(self_filter, data)
+
+        return self_filter(data)
+
+    def _record_filter(self, self_filter: FilterProtocol, started: int, filter_result: Any):
+        elapsed = perf_counter_ns() - started
+
+        if self.filter_profile is not None:
+            self.filter_profile.record(self_filter, elapsed, filter_result)
+
+        if self.metrics is not None:
+            self.metrics.record_filter(self_filter, elapsed, filter_result)
+
+    def _get_memoized(self, self_filter: FilterProtocol, data: RoutingData) -> Optional[bool]:
+        filter_result = data.used_filters.get(self_filter, None)
+
+        if filter_result is not None and self.metrics is not None:
+            self.metrics.record_memo_hit(self_filter)
+
+        return filter_result
+
+    async def _gather_filters(self, filters: list[FilterProtocol], data: RoutingData) -> bool:
+        # the filter and when it was called, the time of the filters that
+        # are awaited together includes the wait for the others
+        tasks: dict[asyncio.Future, tuple[FilterProtocol, int]] = {}
+        observed = self.filter_profile is not None or self.metrics is not None
+
+        try:
+            for self_filter in filters:
+                started = perf_counter_ns() if observed else 0
+                filter_result = self._call_filter(self_filter, data)
+
+                if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                    tasks[asyncio.ensure_future(filter_result)] = (self_filter, started)
+                    continue
+
+                if observed:
+                    self._record_filter(self_filter, started, filter_result)
+
+                data.used_filters[self_filter] = filter_result
+
+                if not filter_result:
+                    return False
+
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    self_filter, started = tasks.pop(task)
+
+                    filter_result = task.result()
+
+                    if observed:
+                        self._record_filter(self_filter, started, filter_result)
+
+                    data.used_filters[self_filter] = filter_result
+
+                    if not filter_result:
+                        return False
+
+            return True
+
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _check_filters_concurrently(self, data: RoutingData) -> bool:
+        group: list[FilterProtocol] = []
+        observed = self.filter_profile is not None or self.metrics is not None
+
+        for self_filter in self._filters:
+            filter_result = self._get_memoized(self_filter, data)
+
+            if filter_result is not None:
+                if not filter_result:
+                    return False
+
+                continue
+
+            if self.concurrent_filters or getattr(self_filter, "concurrent", False):
+                if self_filter not in group:
+                    group.append(self_filter)
+
+                continue
+
+            if group:
+                if not await self._gather_filters(group, data):
+                    return False
+
+                group = []
+
+                filter_result = self._get_memoized(self_filter, data)
+
+                if filter_result is not None:
+                    if not filter_result:
+                        return False
+
+                    continue
+
+            started = perf_counter_ns() if observed else 0
+            filter_result = self._call_filter(self_filter, data)
+
+            if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                filter_result = await filter_result
+
+            if observed:
+                self._record_filter(self_filter, started, filter_result)
+
+            data.used_filters[self_filter] = filter_result
+
+            if not filter_result:
+                return False
+
+        if group:
+            return await self._gather_filters(group, data)
+
+        return True
+
     async def route(
             self,
             data: RoutingData,
             iterator: RouterIteratorProtocol
     ) -> Any:
+        metrics = self.metrics
+        blocking_pool = self.blocking_pool
+
+        if metrics is not None:
+            route_started = perf_counter_ns()
 
         for middleware in self.middlewares:
             if middleware not in data.used_middlewares:
-                await middleware(data)
+                if metrics is not None:
+                    started = perf_counter_ns()
+
+                if blocking_pool is None:
+                    middleware_result = middleware(data)
+
+                else:
+                    middleware_result = blocking_pool.call(middleware, data)
+
+                if middleware_result is not None and isawaitable(middleware_result):
+                    await middleware_result
+
+                if metrics is not None:
+                    metrics.record_middleware(middleware, perf_counter_ns() - started)
+
                 data.used_middlewares.add(middleware)
 
-        for self_filter in self.filters:
-            filter_result = data.used_filters.get(self_filter, None)
+        profile = self.filter_profile
+        observed = profile is not None or metrics is not None
 
-            if filter_result is not None:
-                if not filter_result:
-                    return iterator.on_nothing
+        if profile is not None and profile.is_due():
+            self._reorder_filters(profile.order(self._filters))
+
+        passed = True
+
+        if self._concurrent:
+            passed = await self._check_filters_concurrently(data)
+            filters = ()
+
+        else:
+            filters = self._filters
+
+        results = data.used_filters.reserve(self._filter_bound)
+
+        for self_filter, filter_id in zip(filters, self._filter_ids):
+            memoized = results[filter_id]
+
+            if memoized:
+                if metrics is not None:
+                    metrics.record_memo_hit(self_filter)
+
+                if memoized == FAILED:
+                    passed = False
+                    break
 
                 continue
 
-            filter_result = await self_filter(data)
-            data.used_filters[self_filter] = filter_result
+            if observed:
+                started = perf_counter_ns()
 
-            if not filter_result:
-                return iterator.on_nothing
+            filter_result = self_filter(data)
+
+            if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                filter_result = await filter_result
+
+            if observed:
+                elapsed = perf_counter_ns() - started
+
+                if profile is not None:
+                    profile.record(self_filter, elapsed, filter_result)
+
+                if metrics is not None:
+                    metrics.record_filter(self_filter, elapsed, filter_result)
+
+            if filter_result:
+                results[filter_id] = PASSED
+
+            else:
+                results[filter_id] = FAILED
+                passed = False
+                break
+
+        if not passed:
+            if metrics is not None:
+                metrics.record_router(self.name, perf_counter_ns() - route_started, False)
+
+            return iterator.on_nothing
 
         for inner in self.inner_middlewares:
             data.inner_middlewares.add(inner)
 
-        result = await iterator(self.routers, data, self.data)
+        result = await iterator(self.select_routers(data), data, self.data)
+
+        # a copy, the concurrent branches of ParallelAllTrueRouterIterator
+        # can add to the set while the middlewares are awaited
+        for inner in tuple(data._inner_middlewares or ()):
+            if metrics is not None:
+                started = perf_counter_ns()
+
+            if blocking_pool is None:
+                inner_result = inner(data)
 
-        for inner in data.inner_middlewares:
-            await inner(data)
+            else:
+                inner_result = blocking_pool.call(inner, data)
+
+            if inner_result is not None and isawaitable(inner_result):
+                await inner_result
+
+            if metrics is not None:
+                metrics.record_middleware(inner, perf_counter_ns() - started)
+
+        if metrics is not None:
+            metrics.record_router(self.name, perf_counter_ns() - route_started, True)
 
         return result
 
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        metrics = self.metrics
+
+        if metrics is not None:
+            route_started = perf_counter_ns()
+
+        for middleware in self.middlewares:
+            if middleware not in data.used_middlewares:
+                if metrics is not None:
+                    started = perf_counter_ns()
+
+                resolve_sync(middleware(data))
+
+                if metrics is not None:
+                    metrics.record_middleware(middleware, perf_counter_ns() - started)
+
+                data.used_middlewares.add(middleware)
+
+        profile = self.filter_profile
+        observed = profile is not None or metrics is not None
+
+        if profile is not None and profile.is_due():
+            self._reorder_filters(profile.order(self._filters))
+
+        passed = True
+
+        results = data.used_filters.reserve(self._filter_bound)
+
+        for self_filter, filter_id in zip(self._filters, self._filter_ids):
+            memoized = results[filter_id]
+
+            if memoized:
+                if metrics is not None:
+                    metrics.record_memo_hit(self_filter)
+
+                if memoized == FAILED:
+                    passed = False
+                    break
+
+                continue
+
+            if observed:
+                started = perf_counter_ns()
+
+            filter_result = resolve_sync(self_filter(data))
+
+            if observed:
+                elapsed = perf_counter_ns() - started
+
+                if profile is not None:
+                    profile.record(self_filter, elapsed, filter_result)
+
+                if metrics is not None:
+                    metrics.record_filter(self_filter, elapsed, filter_result)
+
+            if filter_result:
+                results[filter_id] = PASSED
+
+            else:
+                results[filter_id] = FAILED
+                passed = False
+                break
+
+        if not passed:
+            if metrics is not None:
+                metrics.record_router(self.name, perf_counter_ns() - route_started, False)
+
+            return iterator.on_nothing
+
+        for inner in self.inner_middlewares:
+            data.inner_middlewares.add(inner)
+
+        result = iterator.sync(self.select_routers(data), data, self.data)
+
+        for inner in tuple(data._inner_middlewares or ()):
+            if metrics is not None:
+                started = perf_counter_ns()
+
+            resolve_sync(inner(data))
+
+            if metrics is not None:
+                metrics.record_middleware(inner, perf_counter_ns() - started)
+
+        if metrics is not None:
+            metrics.record_router(self.name, perf_counter_ns() - route_started, True)
+
+        return result
+
+    async def route_many(
+            self,
+            datas: list[RoutingData],
+            iterator: RouterIteratorProtocol
+    ) -> list[Any]:
+        """
+        Routes a batch of data at once. Every router is visited once per
+        batch and its filters are applied to the data that are still
+        passing, with the filter's batch method if it has one.
+        :return: the results in the order of the datas
+        """
+        results = [iterator.on_nothing] * len(datas)
+        blocking_pool = self.blocking_pool
+
+        for data in datas:
+            for middleware in self.middlewares:
+                if middleware not in data.used_middlewares:
+                    if blocking_pool is None:
+                        middleware_result = middleware(data)
+
+                    else:
+                        middleware_result = blocking_pool.call(middleware, data)
+
+                    if middleware_result is not None and isawaitable(middleware_result):
+                        await middleware_result
+
+                    data.used_middlewares.add(middleware)
+
+        passed = list(range(len(datas)))
+
+        memos = [data.used_filters.reserve(self._filter_bound) for data in datas]
+
+        for self_filter, filter_id in zip(self._filters, self._filter_ids):
+            unknown = []
+            still_passed = []
+
+            for position in passed:
+                memoized = memos[position][filter_id]
+
+                if not memoized:
+                    unknown.append(position)
+
+                elif memoized == PASSED:
+                    still_passed.append(position)
+
+            if unknown:
+                batch = getattr(self_filter, "batch", None)
+
+                if batch is not None:
+                    filter_results = batch([datas[position] for position in unknown])
+
+                    if isawaitable(filter_results):
+                        filter_results = await filter_results
+
+                    filter_results = [bool(filter_result) for filter_result in filter_results]
+
+                elif self.cpu_pool is not None and getattr(self_filter, "cpu_bound", False):
+                    # the batch is spread over the processes of the pool
+                    filter_results = await asyncio.gather(
+                        *[self.cpu_pool.run(self_filter, datas[position]) for position in unknown]
+                    )
+
+                elif self.blocking_pool is not None and getattr(self_filter, "blocking", False):
+                    filter_results = await asyncio.gather(
+                        *[self.blocking_pool.run(self_filter, datas[position]) for position in unknown]
+                    )
+
+                else:
+                    filter_results = []
+
+                    for position in unknown:
+                        filter_result = self_filter(datas[position])
+
+                        if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                            filter_result = await filter_result
+
+                        filter_results.append(filter_result)
+
+                for position, filter_result in zip(unknown, filter_results):
+                    if filter_result:
+                        memos[position][filter_id] = PASSED
+                        still_passed.append(position)
+
+                    else:
+                        memos[position][filter_id] = FAILED
+
+                still_passed.sort()
+
+            passed = still_passed
+
+            if not passed:
+                return results
+
+        groups: dict[int, tuple[list[RouterProtocol], list[int]]] = {}
+
+        for position in passed:
+            data = datas[position]
+
+            for inner in self.inner_middlewares:
+                data.inner_middlewares.add(inner)
+
+            routers = self.select_routers(data)
+            groups.setdefault(id(routers), (routers, []))[1].append(position)
+
+        for routers, positions in groups.values():
+            group_results = await iterator.many(
+                routers,
+                [datas[position] for position in positions],
+                self.data
+            )
+
+            for position, result in zip(positions, group_results):
+                results[position] = result
+
+        for position in passed:
+            data = datas[position]
+
+            for inner in tuple(data._inner_middlewares or ()):
+                if blocking_pool is None:
+                    inner_result = inner(data)
+
+                else:
+                    inner_result = blocking_pool.call(inner, data)
+
+                if inner_result is not None and isawaitable(inner_result):
+                    await inner_result
+
+        return results
+
+    def compile(self) -> "CompiledRouter":
+        from .compiled import CompiledRouter
+
+        return CompiledRouter(self)
+
     def get_routers_schema(self, with_parents: bool = False) -> RouterSchema:
         children = []
 
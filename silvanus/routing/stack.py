@@ -0,0 +1,445 @@
+from time import perf_counter_ns
+from typing import Any, AsyncIterator, Awaitable, Generator, Iterator, Optional, TYPE_CHECKING
+from inspect import isawaitable
+
+from silvanus.structures.base import (
+    RoutingData,
+    FilterProtocol,
+    MiddlewareProtocol,
+    RouterSchema,
+    RouterProtocol,
+    SYNC_FILTER_RESULTS
+)
+
+from silvanus.structures.memo import FAILED, PASSED
+from silvanus.strategy.routers.base import RouterIteratorProtocol
+from silvanus.strategy.routers import AllTrueRouterIterator
+
+from .simple import SimpleRouter, resolve_sync
+from .metrics import RoutingMetrics
+
+if TYPE_CHECKING:
+    from .offload import ProcessFilterPool, BlockingPool
+
+
+__all__ = ["StackRouter", ]
+
+
+class _Frame:
+    __slots__ = (
+        "router",
+        "children",
+        "started"
+    )
+
+    def __init__(self, router: SimpleRouter, children: Iterator[RouterProtocol], started: int):
+        self.router = router
+        self.children = children
+        self.started = started
+
+
+class _Match:
+    __slots__ = ("value", )
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+class StackRouter:
+    """
+    Routes through a live SimpleRouter tree with an explicit stack instead
+    of a recursion through router.route and iterator.__call__, so the depth
+    of the tree is not limited by the interpreter stack and every level
+    costs the same. The middlewares, the filters memo, the inner
+    middlewares, select_routers, the adaptive filter order and the metrics
+    work as in SimpleRouter.route. Unlike CompiledRouter, changes of the
+    tree are seen immediately.
+
+    Routers that are not SimpleRouters (or override route) are routed with
+    their own route method.
+
+    stream gives the results of AllTrueRouterIterator one by one, while
+    the tree is walked.
+    """
+
+    __slots__ = ("router", )
+
+    def __init__(self, router: RouterProtocol):
+        self.router = router
+
+    @property
+    def name(self) -> str:
+        return self.router.name
+
+    @property
+    def version(self) -> int:
+        return getattr(self.router, "version", 0)
+
+    def _add_parent(self, parent: SimpleRouter):
+        add_parent = getattr(self.router, "_add_parent", None)
+
+        if add_parent is not None:
+            add_parent(parent)
+
+    def add_filter(self, filter_: FilterProtocol):
+        self.router.add_filter(filter_)
+
+    def add_middleware(self, middleware: MiddlewareProtocol, inner: bool = False):
+        self.router.add_middleware(middleware, inner=inner)
+
+    def add_router(self, router: "RouterProtocol"):
+        self.router.add_router(router)
+
+    def add_routers(self, routers: list["RouterProtocol"]):
+        self.router.add_routers(routers)
+
+    def get_routers_schema(self, with_parents: bool = False) -> RouterSchema:
+        return self.router.get_routers_schema(with_parents=with_parents)
+
+    def set_metrics(self, metrics: Optional[RoutingMetrics], recursive: bool = True):
+        set_metrics = getattr(self.router, "set_metrics", None)
+
+        if set_metrics is not None:
+            set_metrics(metrics, recursive=recursive)
+
+    def set_cpu_pool(self, pool: Optional["ProcessFilterPool"], recursive: bool = True):
+        set_cpu_pool = getattr(self.router, "set_cpu_pool", None)
+
+        if set_cpu_pool is not None:
+            set_cpu_pool(pool, recursive=recursive)
+
+    def set_blocking_pool(self, pool: Optional["BlockingPool"], recursive: bool = True):
+        set_blocking_pool = getattr(self.router, "set_blocking_pool", None)
+
+        if set_blocking_pool is not None:
+            set_blocking_pool(pool, recursive=recursive)
+
+    @staticmethod
+    def _enter(router: SimpleRouter, data: RoutingData, sync: bool) -> Generator[Awaitable, Any, bool]:
+        metrics = router.metrics
+        blocking_pool = None if sync else router.blocking_pool
+
+        for middleware in router.middlewares:
+            if middleware not in data.used_middlewares:
+                if metrics is not None:
+                    started = perf_counter_ns()
+
+                if blocking_pool is None:
+                    middleware_result = middleware(data)
+
+                else:
+                    middleware_result = blocking_pool.call(middleware, data)
+
+                if middleware_result is not None and isawaitable(middleware_result):
+                    yield middleware_result
+
+                if metrics is not None:
+                    metrics.record_middleware(middleware, perf_counter_ns() - started)
+
+                data.used_middlewares.add(middleware)
+
+        profile = router.filter_profile
+        observed = profile is not None or metrics is not None
+
+        if profile is not None and profile.is_due():
+            router._reorder_filters(profile.order(router._filters))
+
+        if router._concurrent and not sync:
+            return (yield router._check_filters_concurrently(data))
+
+        results = data.used_filters.reserve(router._filter_bound)
+
+        for self_filter, filter_id in zip(router._filters, router._filter_ids):
+            memoized = results[filter_id]
+
+            if memoized:
+                if metrics is not None:
+                    metrics.record_memo_hit(self_filter)
+
+                if memoized == FAILED:
+                    return False
+
+                continue
+
+            if observed:
+                started = perf_counter_ns()
+
+            filter_result = self_filter(data)
+
+            if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                filter_result = yield filter_result
+
+            if observed:
+                elapsed = perf_counter_ns() - started
+
+                if profile is not None:
+                    profile.record(self_filter, elapsed, filter_result)
+
+                if metrics is not None:
+                    metrics.record_filter(self_filter, elapsed, filter_result)
+
+            if not filter_result:
+                results[filter_id] = FAILED
+                return False
+
+            results[filter_id] = PASSED
+
+        return True
+
+    @staticmethod
+    def _leave(frame: _Frame, data: RoutingData, sync: bool) -> Generator[Awaitable, Any, None]:
+        metrics = frame.router.metrics
+        blocking_pool = None if sync else frame.router.blocking_pool
+
+        for inner in tuple(data._inner_middlewares or ()):
+            if metrics is not None:
+                started = perf_counter_ns()
+
+            if blocking_pool is None:
+                inner_result = inner(data)
+
+            else:
+                inner_result = blocking_pool.call(inner, data)
+
+            if inner_result is not None and isawaitable(inner_result):
+                yield inner_result
+
+            if metrics is not None:
+                metrics.record_middleware(inner, perf_counter_ns() - started)
+
+        if metrics is not None:
+            metrics.record_router(frame.router.name, perf_counter_ns() - frame.started, True)
+
+    def _walk(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol,
+            sync: bool,
+            stream: bool = False
+    ) -> Generator[Awaitable | _Match, Any, Any]:
+        """
+        Walks the tree and yields every awaitable it meets, the driver
+        (route, route_sync or stream) sends the results back. In the stream
+        mode the results are yielded as _Match too, the driver sends back
+        True to stop the walk
+        """
+        find_all = getattr(iterator, "find_all", None)
+
+        if find_all is None:
+            raise TypeError(f"{type(iterator).__name__} is not supported by {type(self).__name__}")
+
+        # the maximum number of results when all are searched
+        limit: Optional[int] = getattr(iterator, "max_results", None)
+
+        # the per-call state of a parent walk collects the results itself,
+        # see RouterIteratorProtocol
+        returned: Optional[list[Any]] = getattr(iterator, "returned", None)
+        nested = returned is not None
+
+        if not nested:
+            returned = []
+
+        stack: list[_Frame] = []
+
+        entered = False
+
+        router: Optional[RouterProtocol] = self.router
+
+        while True:
+            if router is not None:
+                if not isinstance(router, SimpleRouter) or type(router).route is not SimpleRouter.route:
+                    if sync:
+                        result = router.route_sync(data, iterator)
+
+                    else:
+                        result = yield router.route(data, iterator)
+
+                    if result is not iterator.on_nothing:
+                        entered = True
+
+                        if not find_all:
+                            while stack:
+                                yield from self._leave(stack.pop(), data, sync)
+
+                            return result
+
+                        if not stream:
+                            returned.extend(result)
+
+                        else:
+                            for value in result:
+                                if (yield _Match(value)):
+                                    while stack:
+                                        yield from self._leave(stack.pop(), data, sync)
+
+                                    return None
+
+                    if limit is not None and len(returned) >= limit:
+                        del returned[limit:]
+
+                        while stack:
+                            yield from self._leave(stack.pop(), data, sync)
+
+                        return iterator.on_nothing if nested else returned
+
+                else:
+                    metrics = router.metrics
+                    started = perf_counter_ns() if metrics is not None else 0
+
+                    if (
+                            router.middlewares
+                            or metrics is not None
+                            or router.filter_profile is not None
+                            or router._concurrent
+                    ):
+                        passed = yield from self._enter(router, data, sync)
+
+                    else:
+                        # the common case, inlined to keep the cost of a level low
+                        passed = True
+                        results = data.used_filters.reserve(router._filter_bound)
+
+                        for self_filter, filter_id in zip(router._filters, router._filter_ids):
+                            memoized = results[filter_id]
+
+                            if memoized:
+                                if memoized == FAILED:
+                                    passed = False
+                                    break
+
+                                continue
+
+                            filter_result = self_filter(data)
+
+                            if type(filter_result) not in SYNC_FILTER_RESULTS and isawaitable(filter_result):
+                                filter_result = yield filter_result
+
+                            if not filter_result:
+                                results[filter_id] = FAILED
+                                passed = False
+                                break
+
+                            results[filter_id] = PASSED
+
+                    if not passed:
+                        if metrics is not None:
+                            metrics.record_router(router.name, perf_counter_ns() - started, False)
+
+                    else:
+                        entered = True
+
+                        for inner in router.inner_middlewares:
+                            data.inner_middlewares.add(inner)
+
+                        stack.append(_Frame(router, iter(router.select_routers(data)), started))
+
+                        if router.data:
+                            if not find_all:
+                                while stack:
+                                    yield from self._leave(stack.pop(), data, sync)
+
+                                return router.data
+
+                            if not stream:
+                                returned.append(router.data)
+
+                                if limit is not None and len(returned) >= limit:
+                                    while stack:
+                                        yield from self._leave(stack.pop(), data, sync)
+
+                                    return iterator.on_nothing if nested else returned
+
+                            elif (yield _Match(router.data)):
+                                while stack:
+                                    yield from self._leave(stack.pop(), data, sync)
+
+                                return None
+
+            if not stack:
+                break
+
+            router = next(stack[-1].children, None)
+
+            while router is None:
+                frame = stack.pop()
+
+                if data._inner_middlewares or frame.router.metrics is not None:
+                    yield from self._leave(frame, data, sync)
+
+                if not stack:
+                    break
+
+                router = next(stack[-1].children, None)
+
+            if router is None:
+                break
+
+        if nested or not entered or not find_all:
+            return iterator.on_nothing
+
+        return returned
+
+    async def stream(self, data: RoutingData) -> AsyncIterator[Any]:
+        """
+        Yields the data of the routers that passed, in the tree order, as
+        soon as they are found. When the consumer stops early, the rest of
+        the tree is not walked, and the inner middlewares of the routers
+        that passed run when the stream is closed (use
+        contextlib.aclosing to close it right after the break)
+        :param data:
+        :return:
+        """
+        walk = self._walk(data, AllTrueRouterIterator(), sync=False, stream=True)
+
+        try:
+            item = next(walk)
+
+            while True:
+                if type(item) is not _Match:
+                    item = walk.send(await item)
+                    continue
+
+                try:
+                    yield item.value
+
+                except GeneratorExit:
+                    # only awaitables are yielded by the walk from now on
+                    item = walk.send(True)
+                    continue
+
+                item = walk.send(False)
+
+        except StopIteration:
+            return
+
+    async def route(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        walk = self._walk(data, iterator, sync=False)
+
+        try:
+            awaitable = next(walk)
+
+            while True:
+                awaitable = walk.send(await awaitable)
+
+        except StopIteration as stop:
+            return stop.value
+
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        walk = self._walk(data, iterator, sync=True)
+
+        try:
+            awaitable = next(walk)
+
+            while True:
+                awaitable = walk.send(resolve_sync(awaitable))
+
+        except StopIteration as stop:
+            return stop.value
@@ -1,2 +1,5 @@
 from .first import FirstTrueRouterIterator
 from .all import AllTrueRouterIterator
+from .first_n import FirstNTrueRouterIterator
+from .best_first import BestFirstRouterIterator
+from .parallel import ParallelAllTrueRouterIterator
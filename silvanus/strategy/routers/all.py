@@ -1,14 +1,21 @@
-from typing import Protocol, Any, TYPE_CHECKING
+from typing import Any, ClassVar, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from silvanus.structures.base import RouterProtocol, RoutingData
 
 
-class AllTrueRouterIterator(Protocol):
-    def __init__(self, on_nothing: Any = None):
-        self._returned = []
-        self._nested = False
+class _AllTrueCall:
+    __slots__ = (
+        "on_nothing",
+        "returned"
+    )
+
+    find_all: ClassVar[bool] = True
+    max_results: ClassVar[Optional[int]] = None
+
+    def __init__(self, on_nothing: Any):
         self.on_nothing = on_nothing
+        self.returned = []
 
     async def __call__(
             self,
@@ -16,20 +23,118 @@ class AllTrueRouterIterator(Protocol):
             data: "RoutingData",
             router_data: Any
     ) -> Any:
-        nested = self._nested
-        self._nested = True
-
         if router_data:
-            self._returned.append(router_data)
+            self.returned.append(router_data)
 
         for router in routers:
             result = await router.route(data, self)
 
             if result is not self.on_nothing:
-                self._returned.extend(result)
+                self.returned.extend(result)
+
+        return self.on_nothing
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            self.returned.append(router_data)
+
+        for router in routers:
+            result = router.route_sync(data, self)
+
+            if result is not self.on_nothing:
+                self.returned.extend(result)
+
+        return self.on_nothing
+
+
+class _AllTrueManyCall:
+    __slots__ = (
+        "on_nothing",
+        "calls"
+    )
+
+    def __init__(self, on_nothing: Any, calls: dict[int, _AllTrueCall]):
+        self.on_nothing = on_nothing
+        self.calls = calls
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        if router_data:
+            for data in datas:
+                self.calls[id(data)].returned.append(router_data)
+
+        for router in routers:
+            route_many = getattr(router, "route_many", None)
+
+            if route_many is not None:
+                await route_many(datas, self)
+                continue
+
+            for data in datas:
+                call = self.calls[id(data)]
+                result = await router.route(data, call)
+
+                if result is not self.on_nothing:
+                    call.returned.extend(result)
+
+        return [self.on_nothing] * len(datas)
+
+
+class AllTrueRouterIterator:
+    """
+    Returns the data of all the routers that passed, in the tree order.
+    The state of a call lives in a separate object, so one instance can
+    be shared by any number of concurrent route calls.
+    """
+
+    find_all: ClassVar[bool] = True
+    max_results: ClassVar[Optional[int]] = None
+
+    def __init__(self, on_nothing: Any = None):
+        self.on_nothing = on_nothing
+
+    async def __call__(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        call = _AllTrueCall(self.on_nothing)
+        await call(routers, data, router_data)
+
+        return call.returned
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        call = _AllTrueCall(self.on_nothing)
+        call.sync(routers, data, router_data)
+
+        return call.returned
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        calls = [_AllTrueCall(self.on_nothing) for _ in datas]
 
-        if not nested:
-            return self._returned
+        await _AllTrueManyCall(
+            self.on_nothing,
+            {id(data): call for data, call in zip(datas, calls)}
+        ).many(routers, datas, router_data)
 
-        else:
-            return self.on_nothing
+        return [call.returned for call in calls]
@@ -1,10 +1,25 @@
-from typing import Protocol, Any, TYPE_CHECKING
+from typing import Protocol, Any, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from silvanus.structures.base import RouterProtocol, RoutingData
 
 class RouterIteratorProtocol(Protocol):
+    """
+    Routers that walk their subtree themselves (CompiledRouter, StackRouter)
+    read the strategy from the attributes:
+    find_all - False to stop at the first result, True to collect them all
+    max_results - the maximum number of collected results, None for no limit
+    returned - only set on the per-call state of a parent walk (see
+    _AllTrueCall), the nested walk adds its results to this list and
+    returns on_nothing
+
+    CachedRouter routes without the cache if the iterator has a false
+    cacheable attribute
+    """
+
     on_nothing: str
+    find_all: bool
+    max_results: Optional[int]
 
     async def __call__(
             self,
@@ -13,3 +28,19 @@ class RouterIteratorProtocol(Protocol):
             router_data: Any
     ) -> Any:
         raise NotImplemented()
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        raise NotImplemented()
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        raise NotImplemented()
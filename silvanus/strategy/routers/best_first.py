@@ -0,0 +1,185 @@
+import math
+
+from heapq import heappush, heappop
+from typing import Any, ClassVar, Generator, Iterable, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from silvanus.structures.base import RouterProtocol, RoutingData
+
+
+_ENTERED = object()
+
+
+def get_priority_bound(router: "RouterProtocol") -> float:
+    """
+    The highest priority that can be found in the subtree of the router.
+    Routers without priorities (not SimpleRouters) have the priority 0
+    :param router:
+    :return:
+    """
+    return getattr(router, "priority_bound", getattr(router, "priority", 0))
+
+
+class _BestFirstCall:
+    """
+    The iterator given to the routers while searching. It only records
+    the children and the data of the router that passed, the search
+    decides which router is entered next
+    """
+
+    __slots__ = (
+        "on_nothing",
+        "selected"
+    )
+
+    # routers that walk their subtree themselves give their first result,
+    # it is taken as the result of the subtree
+    find_all: ClassVar[bool] = False
+    max_results: ClassVar[Optional[int]] = None
+
+    # the routers only report that they passed, the result is not final
+    cacheable: ClassVar[bool] = False
+
+    def __init__(self, on_nothing: Any):
+        self.on_nothing = on_nothing
+        self.selected: Any = None
+
+    async def __call__(
+            self,
+            routers: Iterable["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        self.selected = (routers, router_data)
+        return _ENTERED
+
+    def sync(
+            self,
+            routers: Iterable["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        self.selected = (routers, router_data)
+        return _ENTERED
+
+    def search(self, routers: Iterable["RouterProtocol"]) -> Generator["RouterProtocol", Any, Any]:
+        """
+        Yields the routers to route with self as the iterator, the driver
+        sends the results back
+        """
+        # (-priority, path in the tree, is a result, router or data)
+        heap: list[tuple[float, tuple[int, ...], bool, Any]] = []
+
+        self._push(heap, routers, ())
+
+        while heap:
+            _, path, is_result, value = heappop(heap)
+
+            if is_result:
+                return value
+
+            self.selected = None
+            result = yield value
+
+            if result is self.on_nothing:
+                continue
+
+            if result is not _ENTERED or self.selected is None:
+                # the router doesn't use the iterator, its result is final
+                return result
+
+            children, router_data = self.selected
+
+            if router_data:
+                heappush(heap, (-getattr(value, "priority", 0), path, True, router_data))
+
+            self._push(heap, children, path)
+
+        return self.on_nothing
+
+    @staticmethod
+    def _push(
+            heap: list[tuple[float, tuple[int, ...], bool, Any]],
+            routers: Iterable["RouterProtocol"],
+            path: tuple[int, ...]
+    ):
+        for position, router in enumerate(routers):
+            bound = get_priority_bound(router)
+
+            if bound != -math.inf:
+                heappush(heap, (-bound, path + (position, ), False, router))
+
+
+class BestFirstRouterIterator:
+    """
+    Returns the data of the passed router with the highest priority in the
+    whole tree (see SimpleRouter.priority), the first one in the tree order
+    if several have the same priority. The candidates are kept in a heap
+    by the highest priority of their subtrees (SimpleRouter.priority_bound),
+    so the branches that can't beat the best result are never entered and
+    their filters are never checked. The subtrees without data are skipped.
+    The data of the router the routing starts from is returned right away,
+    as with FirstTrueRouterIterator.
+
+    The inner middlewares run once for every router that passed, as in
+    SimpleRouter.route, but when the router is entered instead of after
+    its children. Only routers that pass their children to the iterator
+    (all the SimpleRouters) are searched, other routers are routed with
+    the search iterator as a whole, their result is taken as is.
+    """
+
+    def __init__(self, on_nothing: Any = None):
+        self.on_nothing = on_nothing
+
+    async def __call__(
+            self,
+            routers: Iterable["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            return router_data
+
+        call = _BestFirstCall(self.on_nothing)
+        search = call.search(routers)
+
+        try:
+            router = next(search)
+
+            while True:
+                router = search.send(await router.route(data, call))
+
+        except StopIteration as stop:
+            return stop.value
+
+    def sync(
+            self,
+            routers: Iterable["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            return router_data
+
+        call = _BestFirstCall(self.on_nothing)
+        search = call.search(routers)
+
+        try:
+            router = next(search)
+
+            while True:
+                router = search.send(router.route_sync(data, call))
+
+        except StopIteration as stop:
+            return stop.value
+
+    async def many(
+            self,
+            routers: Iterable["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        # every data takes its own way through the tree
+        routers = list(routers)
+
+        return [await self(routers, data, router_data) for data in datas]
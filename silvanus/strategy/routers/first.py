@@ -1,10 +1,13 @@
-from typing import Protocol, Any, TYPE_CHECKING
+from typing import Any, ClassVar, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from silvanus.structures.base import RouterProtocol, RoutingData
 
 
-class FirstTrueRouterIterator(Protocol):
+class FirstTrueRouterIterator:
+    find_all: ClassVar[bool] = False
+    max_results: ClassVar[Optional[int]] = None
+
     def __init__(self, on_nothing: Any = None):
         self.on_nothing = on_nothing
 
@@ -24,3 +27,57 @@ class FirstTrueRouterIterator(Protocol):
                 return result
 
         return self.on_nothing
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            return router_data
+
+        for router in routers:
+            result = router.route_sync(data, self)
+
+            if result is not self.on_nothing:
+                return result
+
+        return self.on_nothing
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        if router_data:
+            return [router_data] * len(datas)
+
+        results = [self.on_nothing] * len(datas)
+        waiting = list(range(len(datas)))
+
+        for router in routers:
+            if not waiting:
+                break
+
+            route_many = getattr(router, "route_many", None)
+
+            if route_many is None:
+                router_results = [await router.route(datas[position], self) for position in waiting]
+
+            else:
+                router_results = await route_many([datas[position] for position in waiting], self)
+
+            still_waiting = []
+
+            for position, result in zip(waiting, router_results):
+                if result is not self.on_nothing:
+                    results[position] = result
+
+                else:
+                    still_waiting.append(position)
+
+            waiting = still_waiting
+
+        return results
@@ -0,0 +1,181 @@
+from typing import Any, ClassVar, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from silvanus.structures.base import RouterProtocol, RoutingData
+
+
+class _FirstNTrueCall:
+    __slots__ = (
+        "on_nothing",
+        "count",
+        "returned"
+    )
+
+    find_all: ClassVar[bool] = True
+
+    def __init__(self, on_nothing: Any, count: int):
+        self.on_nothing = on_nothing
+        self.count = count
+        self.returned = []
+
+    @property
+    def max_results(self) -> int:
+        return self.count
+
+    @property
+    def full(self) -> bool:
+        return len(self.returned) >= self.count
+
+    def add(self, result: list[Any]):
+        self.returned.extend(result[:self.count - len(self.returned)])
+
+    async def __call__(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            self.returned.append(router_data)
+
+        for router in routers:
+            if self.full:
+                break
+
+            result = await router.route(data, self)
+
+            if result is not self.on_nothing:
+                self.add(result)
+
+        return self.on_nothing
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        if router_data:
+            self.returned.append(router_data)
+
+        for router in routers:
+            if self.full:
+                break
+
+            result = router.route_sync(data, self)
+
+            if result is not self.on_nothing:
+                self.add(result)
+
+        return self.on_nothing
+
+
+class _FirstNTrueManyCall:
+    __slots__ = (
+        "on_nothing",
+        "calls"
+    )
+
+    def __init__(self, on_nothing: Any, calls: dict[int, _FirstNTrueCall]):
+        self.on_nothing = on_nothing
+        self.calls = calls
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        if router_data:
+            for data in datas:
+                self.calls[id(data)].returned.append(router_data)
+
+        for router in routers:
+            waiting = [data for data in datas if not self.calls[id(data)].full]
+
+            if not waiting:
+                break
+
+            route_many = getattr(router, "route_many", None)
+
+            if route_many is not None:
+                await route_many(waiting, self)
+                continue
+
+            for data in waiting:
+                call = self.calls[id(data)]
+                result = await router.route(data, call)
+
+                if result is not self.on_nothing:
+                    call.add(result)
+
+        return [self.on_nothing] * len(datas)
+
+
+class FirstNTrueRouterIterator:
+    """
+    Returns the data of the first count routers that passed, in the tree
+    order, like AllTrueRouterIterator. The routing stops as soon as count
+    results are found, the filters of the following routers are not
+    checked. The state of a call lives in a separate object, so one
+    instance can be shared by any number of concurrent route calls.
+    """
+
+    find_all: ClassVar[bool] = True
+
+    def __init__(self, count: int, on_nothing: Any = None):
+        """
+        :param count: the maximum number of results
+        :param on_nothing: the result if the root router didn't pass
+        """
+        if count < 1:
+            raise ValueError(f"count must be positive, not {count}")
+
+        self.count = count
+        self.on_nothing = on_nothing
+
+    @property
+    def max_results(self) -> int:
+        return self.count
+
+    @property
+    def cache_key(self) -> tuple[type, int]:
+        # the results of the calls with other counts differ, see CachedRouter
+        return FirstNTrueRouterIterator, self.count
+
+    async def __call__(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        call = _FirstNTrueCall(self.on_nothing, self.count)
+        await call(routers, data, router_data)
+
+        return call.returned
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        call = _FirstNTrueCall(self.on_nothing, self.count)
+        call.sync(routers, data, router_data)
+
+        return call.returned
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        calls = [_FirstNTrueCall(self.on_nothing, self.count) for _ in datas]
+
+        await _FirstNTrueManyCall(
+            self.on_nothing,
+            {id(data): call for data, call in zip(datas, calls)}
+        ).many(routers, datas, router_data)
+
+        return [call.returned for call in calls]
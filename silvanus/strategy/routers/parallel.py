@@ -0,0 +1,146 @@
+import asyncio
+
+from typing import Any, ClassVar, Optional, TYPE_CHECKING
+
+from .all import AllTrueRouterIterator
+
+if TYPE_CHECKING:
+    from silvanus.structures.base import RouterProtocol, RoutingData
+
+
+class _ParallelBranch:
+    __slots__ = (
+        "on_nothing",
+        "semaphore"
+    )
+
+    find_all: ClassVar[bool] = True
+    max_results: ClassVar[Optional[int]] = None
+
+    # the routing data is shared by the concurrent branches, see CachedRouter
+    cacheable: ClassVar[bool] = False
+
+    def __init__(self, on_nothing: Any, semaphore: Optional[asyncio.Semaphore]):
+        self.on_nothing = on_nothing
+        self.semaphore = semaphore
+
+    async def _route(self, router: "RouterProtocol", data: "RoutingData") -> Any:
+        branch = _ParallelBranch(self.on_nothing, self.semaphore)
+
+        if self.semaphore is None:
+            return await router.route(data, branch)
+
+        async with self.semaphore:
+            return await router.route(data, branch)
+
+    async def _route_all(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            returned: list[Any]
+    ):
+        if len(routers) == 1:
+            results = [await self._route(routers[0], data)]
+
+        else:
+            results = await asyncio.gather(
+                *[self._route(router, data) for router in routers]
+            )
+
+        for result in results:
+            if result is not self.on_nothing:
+                returned.extend(result)
+
+    async def __call__(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        returned = []
+
+        if router_data:
+            returned.append(router_data)
+
+        # select_routers may return any iterable, e.g. a generator
+        routers = list(routers)
+
+        if not routers:
+            return returned
+
+        # the permit of the router that called us is given back while its
+        # children are routed, otherwise nested routers could wait forever
+        if self.semaphore is not None:
+            self.semaphore.release()
+
+        try:
+            await self._route_all(routers, data, returned)
+
+        finally:
+            if self.semaphore is not None:
+                await self.semaphore.acquire()
+
+        return returned
+
+
+class ParallelAllTrueRouterIterator:
+    """
+    Returns the same results in the same order as AllTrueRouterIterator,
+    but routes the sibling routers concurrently. The routing data is shared
+    by all the branches, so the filters and middlewares of siblings must
+    not depend on each other.
+
+    Routers that walk their subtree themselves (CompiledRouter,
+    StackRouter) route it serially.
+    """
+
+    find_all: ClassVar[bool] = True
+    max_results: ClassVar[Optional[int]] = None
+
+    def __init__(self, on_nothing: Any = None, limit: Optional[int] = None):
+        """
+        :param on_nothing: the result if the root router didn't pass
+        :param limit: the maximum number of routers that check their
+        middlewares and filters at the same time, None for no limit
+        """
+        self.on_nothing = on_nothing
+        self.limit = limit
+
+        self._serial = AllTrueRouterIterator(on_nothing=on_nothing)
+
+    async def __call__(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        semaphore = None
+
+        if self.limit is not None:
+            semaphore = asyncio.Semaphore(self.limit)
+
+        returned = []
+
+        if router_data:
+            returned.append(router_data)
+
+        await _ParallelBranch(self.on_nothing, semaphore)._route_all(list(routers), data, returned)
+
+        return returned
+
+    def sync(
+            self,
+            routers: list["RouterProtocol"],
+            data: "RoutingData",
+            router_data: Any
+    ) -> Any:
+        return self._serial.sync(routers, data, router_data)
+
+    async def many(
+            self,
+            routers: list["RouterProtocol"],
+            datas: list["RoutingData"],
+            router_data: Any
+    ) -> list[Any]:
+        # route_many already checks the filters of the batch together
+        return await self._serial.many(routers, datas, router_data)
@@ -1 +1,12 @@
-from .base import RoutingData, RouterSchema
+from .base import (
+    RoutingData,
+    RoutingDataPool,
+    RouterSchema,
+    FilterResult,
+    FILTER_PASSED,
+    FILTER_FAILED,
+    IndexableFilterProtocol,
+    BatchFilterProtocol,
+    CpuBoundFilterProtocol
+)
+from .memo import FilterMemo, FilterRegistry, filter_registry
@@ -1,19 +1,207 @@
-from typing import Any, Protocol, Optional
-from dataclasses import dataclass, field
+from typing import Any, Awaitable, Generator, Mapping, Protocol, Optional, Sequence, Union
+from dataclasses import dataclass
 
 from silvanus.strategy.routers.base import RouterIteratorProtocol
 
+from .memo import FilterMemo
+
 
-@dataclass(slots=True, kw_only=True)
 class RoutingData:
-    app_data: dict[str, Any] = field(default_factory=dict)
-    request_data: dict[str, Any] = field(default_factory=dict)
-    middleware_data: dict[str, Any] = field(default_factory=dict)
-    filters_data: dict[str, Any] = field(default_factory=dict)
+    """
+    The data of one routing call. middleware_data, filters_data,
+    used_middlewares, inner_middlewares and request_cache are only created
+    on the first access, most requests never touch them
+    """
+
+    __slots__ = (
+        "app_data",
+        "request_data",
+        "used_filters",
+        "_middleware_data",
+        "_filters_data",
+        "_used_middlewares",
+        "_inner_middlewares",
+        "_request_cache",
+        "_released"
+    )
+
+    def __init__(
+            self,
+            *,
+            app_data: Optional[dict[str, Any]] = None,
+            request_data: Optional[dict[str, Any]] = None,
+            middleware_data: Optional[dict[str, Any]] = None,
+            filters_data: Optional[dict[str, Any]] = None,
+            used_filters: Optional[Mapping["FilterProtocol", bool]] = None,
+            used_middlewares: Optional[set["MiddlewareProtocol"]] = None,
+            inner_middlewares: Optional[set["MiddlewareProtocol"]] = None
+    ):
+        self.app_data: dict[str, Any] = {} if app_data is None else app_data
+        self.request_data: dict[str, Any] = {} if request_data is None else request_data
+        self.used_filters = FilterMemo(used_filters)
+
+        self._middleware_data = middleware_data
+        self._filters_data = filters_data
+        self._used_middlewares = used_middlewares
+        self._inner_middlewares = inner_middlewares
+        self._request_cache: Optional[dict[Any, Any]] = None
+
+        self._released = False
+
+    @property
+    def middleware_data(self) -> dict[str, Any]:
+        if self._middleware_data is None:
+            self._middleware_data = {}
+
+        return self._middleware_data
+
+    @middleware_data.setter
+    def middleware_data(self, value: dict[str, Any]):
+        self._middleware_data = value
+
+    @property
+    def filters_data(self) -> dict[str, Any]:
+        if self._filters_data is None:
+            self._filters_data = {}
+
+        return self._filters_data
+
+    @filters_data.setter
+    def filters_data(self, value: dict[str, Any]):
+        self._filters_data = value
+
+    @property
+    def used_middlewares(self) -> set["MiddlewareProtocol"]:
+        if self._used_middlewares is None:
+            self._used_middlewares = set()
+
+        return self._used_middlewares
+
+    @used_middlewares.setter
+    def used_middlewares(self, value: set["MiddlewareProtocol"]):
+        self._used_middlewares = value
+
+    @property
+    def inner_middlewares(self) -> set["MiddlewareProtocol"]:
+        if self._inner_middlewares is None:
+            self._inner_middlewares = set()
+
+        return self._inner_middlewares
+
+    @inner_middlewares.setter
+    def inner_middlewares(self, value: set["MiddlewareProtocol"]):
+        self._inner_middlewares = value
+
+    @property
+    def request_cache(self) -> dict[Any, Any]:
+        """
+        Values the filters computed from the request and want to share with
+        each other during the routing call. It is not compared by __eq__
+        """
+        if self._request_cache is None:
+            self._request_cache = {}
+
+        return self._request_cache
+
+    def reset(self, app_data: Optional[dict[str, Any]] = None, request_data: Optional[dict[str, Any]] = None):
+        """
+        Prepares the data for a new routing call, the containers that were
+        already created are cleared and reused
+        :param app_data:
+        :param request_data:
+        :return:
+        """
+        self.app_data = {} if app_data is None else app_data
+        self.request_data = {} if request_data is None else request_data
+        self.used_filters.clear()
+
+        for container in (
+                self._middleware_data,
+                self._filters_data,
+                self._used_middlewares,
+                self._inner_middlewares,
+                self._request_cache
+        ):
+            if container is not None:
+                container.clear()
+
+    def _as_tuple(self) -> tuple:
+        return (
+            self.app_data,
+            self.request_data,
+            self._middleware_data or {},
+            self._filters_data or {},
+            dict(self.used_filters.items()),
+            self._used_middlewares or set(),
+            self._inner_middlewares or set()
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, RoutingData):
+            return NotImplemented
+
+        return self._as_tuple() == other._as_tuple()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}("
+            f"app_data={self.app_data!r}, "
+            f"request_data={self.request_data!r}, "
+            f"middleware_data={self._middleware_data or {}!r}, "
+            f"filters_data={self._filters_data or {}!r}, "
+            f"used_filters={dict(self.used_filters.items())!r}, "
+            f"used_middlewares={self._used_middlewares or set()!r}, "
+            f"inner_middlewares={self._inner_middlewares or set()!r})"
+        )
+
+
+class RoutingDataPool:
+    """
+    Reuses RoutingData objects (and the containers they have created)
+    between routing calls. A released data must not be used anymore, by
+    the caller or by anything that kept a reference to it or its containers
+    """
+
+    __slots__ = ("maxsize", "_free")
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        :param maxsize: the maximum number of free objects kept by the pool
+        """
+        self.maxsize = maxsize
+        self._free: list[RoutingData] = []
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(
+            self,
+            app_data: Optional[dict[str, Any]] = None,
+            request_data: Optional[dict[str, Any]] = None
+    ) -> RoutingData:
+        if not self._free:
+            return RoutingData(app_data=app_data, request_data=request_data)
+
+        data = self._free.pop()
+        data._released = False
+        data.reset(app_data=app_data, request_data=request_data)
 
-    used_filters: dict["FilterProtocol", bool] = field(default_factory=dict)
-    used_middlewares: set["MiddlewareProtocol"] = field(default_factory=set)
-    inner_middlewares: set["MiddlewareProtocol"] = field(default_factory=set)
+        return data
+
+    def release(self, data: RoutingData):
+        if data._released:
+            raise ValueError(f"{data!r} is already released")
+
+        data._released = True
+
+        # the references to the request are dropped now, the containers
+        # are cleared when the data is acquired again
+        data.app_data = data.request_data = None
+
+        if len(self._free) < self.maxsize:
+            self._free.append(data)
 
 
 @dataclass(slots=True, kw_only=True)
@@ -26,8 +214,40 @@ class RouterSchema:
     parent: Optional["RouterSchema"] = None
 
 
+class FilterResult(int):
+    """
+    The result of the built-in plain filters. The routers take it as a
+    bool, without awaiting it, and it can still be awaited like the result
+    of a coroutine filter: await gives True or False
+    """
+
+    __slots__ = ()
+
+    def __await__(self) -> Generator[Any, Any, bool]:
+        return bool(self)
+        yield
+
+    def __repr__(self) -> str:
+        return repr(bool(self))
+
+
+FILTER_PASSED = FilterResult(1)
+FILTER_FAILED = FilterResult(0)
+
+# the types of the filter results that are never awaited by the routers
+SYNC_FILTER_RESULTS = (bool, FilterResult)
+
+
 class FilterProtocol(Protocol):
-    async def __call__(self, data: RoutingData) -> bool:
+    def __call__(self, data: RoutingData) -> Union[bool, FilterResult, Awaitable[bool]]:
+        """
+        Filters can be plain functions or coroutine functions, plain
+        functions are called by the routers without creating a coroutine.
+        Plain filters that may be awaited by the callers return
+        FILTER_PASSED or FILTER_FAILED
+        :param data:
+        :return:
+        """
         raise NotImplementedError()
 
     def __hash__(self) -> int:
@@ -37,8 +257,42 @@ class FilterProtocol(Protocol):
         raise NotImplementedError()
 
 
+class IndexableFilterProtocol(FilterProtocol, Protocol):
+    """
+    A filter that matches exactly when request_data[index_key] == index_value.
+    Routers can use it to group their children by the value instead of
+    calling every filter.
+    """
+
+    index_key: str
+    index_value: Any
+
+
+class CpuBoundFilterProtocol(FilterProtocol, Protocol):
+    """
+    A filter that does real CPU work. Routers with a ProcessFilterPool run
+    it in the pool: the filter gets a RoutingData with the request_data
+    only (the keys from request_keys, all the keys if it is None), so the
+    filter and these values must be picklable.
+    """
+
+    cpu_bound: bool
+    request_keys: Optional[tuple[str, ...]]
+
+
+class BatchFilterProtocol(FilterProtocol, Protocol):
+    def batch(self, datas: list[RoutingData]) -> Union[Sequence[bool], Awaitable[Sequence[bool]]]:
+        """
+        Checks a batch of data at once, used by route_many.
+        Any sequence of truth values is accepted, e.g. a numpy bool array
+        :param datas:
+        :return: a result for every data, in the same order
+        """
+        raise NotImplementedError()
+
+
 class MiddlewareProtocol(Protocol):
-    async def __call__(self, data: RoutingData):
+    def __call__(self, data: RoutingData) -> Optional[Awaitable[None]]:
         raise NotImplementedError()
 
     def __hash__(self) -> int:
@@ -117,6 +371,35 @@ class RouterProtocol(Protocol):
         """
         raise NotImplementedError()
 
+    def route_sync(
+            self,
+            data: RoutingData,
+            iterator: RouterIteratorProtocol
+    ) -> Any:
+        """
+        The same as route, but without an event loop. Async filters and
+        middlewares are allowed only if they never suspend
+        :param iterator: the determinant of which data to return from the routers
+        :param data: An instance of the data that will be used for routing
+        and adding data to the data
+        :return:
+        """
+        raise NotImplementedError()
+
+    async def route_many(
+            self,
+            datas: list[RoutingData],
+            iterator: RouterIteratorProtocol
+    ) -> list[Any]:
+        """
+        The same as route for a batch of data. Routers without this method
+        are routed one data at a time by the iterators
+        :param iterator: the determinant of which data to return from the routers
+        :param datas: the batch of data
+        :return: the results in the order of the datas
+        """
+        raise NotImplementedError()
+
     def get_routers_schema(self, with_parents: bool = False) -> RouterSchema:
         """
         Returns the router diagram, which may be different
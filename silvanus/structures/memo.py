@@ -0,0 +1,324 @@
+import threading
+
+from typing import Any, ClassVar, Iterable, Iterator, Optional, TYPE_CHECKING
+from heapq import heappush, heappop, heapify
+from collections.abc import MutableMapping
+
+if TYPE_CHECKING:
+    from .base import FilterProtocol
+
+
+__all__ = ["FilterRegistry", "FilterMemo", "filter_registry"]
+
+
+UNKNOWN = 0
+FAILED = 1
+PASSED = 2
+
+
+class FilterRegistry:
+    """
+    Gives every filter in use a dense integer id. Equal filters get the
+    same id, so they share the memoized result like they do as dict keys.
+    The ids are counted by their users (routers and plan nodes): an id is
+    freed when its last user releases it, and the smallest free id is given
+    to the next new filter, so the ids stay below the number of the filters
+    in use. epoch changes when a freed id is given again, the ids given
+    again are logged, see FilterMemo.
+
+    The registry is shared by all the threads, the changes are made under
+    a lock. The ids released by the finalizers (see release_later) are
+    freed by the next change, a finalizer can run in the middle of one.
+    """
+
+    __slots__ = (
+        "ids",
+        "filters",
+        "counts",
+        "epoch",
+        "reused",
+        "_free",
+        "_high",
+        "_pending",
+        "_lock"
+    )
+
+    # the number of the ids given again that are logged
+    reused_size: ClassVar[int] = 1024
+
+    def __init__(self):
+        self.ids: dict["FilterProtocol", int] = {}
+        self.filters: list[Optional["FilterProtocol"]] = []
+        self.counts: list[int] = []
+        self.epoch = 0
+
+        # (offset, ids): the ids given again, ids[epoch - offset - 1] was
+        # given when the epoch became epoch. Replaced as a whole when the
+        # oldest ids are dropped, so the readers don't need the lock
+        self.reused: tuple[int, list[int]] = (0, [])
+
+        self._free: list[int] = []
+        # the number of the ids ever given
+        self._high = 0
+
+        self._pending: list[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _get_free_id(self) -> Optional[int]:
+        free = self._free
+
+        while free:
+            filter_id = heappop(free)
+
+            # the ids above the end of the list were dropped with it
+            if filter_id < len(self.filters):
+                return filter_id
+
+        return None
+
+    def register(self, filter_: "FilterProtocol") -> int:
+        """
+        Returns the id of the filter and counts the caller as its user, the
+        caller must release the id when it doesn't need it anymore
+        """
+        with self._lock:
+            self._release_pending()
+
+            return self._register(filter_)
+
+    def register_many(self, filters: Iterable["FilterProtocol"]) -> tuple[int, ...]:
+        with self._lock:
+            self._release_pending()
+
+            return tuple(self._register(filter_) for filter_ in filters)
+
+    def release(self, filter_id: int):
+        with self._lock:
+            self._release_pending()
+            self._release(filter_id)
+
+    def release_many(self, filter_ids: Iterable[int]):
+        with self._lock:
+            self._release_pending()
+
+            for filter_id in filter_ids:
+                self._release(filter_id)
+
+    def release_later(self, filter_ids: Iterable[int]):
+        """
+        Releases the ids now if the registry is not being changed, with the
+        next change otherwise. For the finalizers: they can run in the
+        middle of a change, in the thread that holds the lock
+        """
+        self._pending.extend(filter_ids)
+
+        if self._lock.acquire(blocking=False):
+            try:
+                self._release_pending()
+
+            finally:
+                self._lock.release()
+
+    def _release_pending(self):
+        pending = self._pending
+
+        while pending:
+            self._release(pending.pop())
+
+    def _register(self, filter_: "FilterProtocol") -> int:
+        filter_id = self.ids.get(filter_, None)
+
+        if filter_id is not None:
+            self.counts[filter_id] += 1
+            return filter_id
+
+        filter_id = self._get_free_id()
+
+        if filter_id is None:
+            filter_id = len(self.filters)
+            self.filters.append(filter_)
+            self.counts.append(1)
+
+        else:
+            self.filters[filter_id] = filter_
+            self.counts[filter_id] = 1
+
+        if filter_id < self._high:
+            self._log_reused(filter_id)
+
+        else:
+            self._high = filter_id + 1
+
+        self.ids[filter_] = filter_id
+
+        return filter_id
+
+    def _log_reused(self, filter_id: int):
+        offset, reused = self.reused
+
+        if len(reused) >= self.reused_size:
+            dropped = len(reused) // 2
+            offset, reused = self.reused = (offset + dropped, reused[dropped:])
+
+        # the epoch is changed last, the readers get it before the ids
+        reused.append(filter_id)
+        self.epoch += 1
+
+    def _release(self, filter_id: int):
+        self.counts[filter_id] -= 1
+
+        if self.counts[filter_id]:
+            return
+
+        del self.ids[self.filters[filter_id]]
+        self.filters[filter_id] = None
+
+        filters = self.filters
+
+        if filter_id == len(filters) - 1:
+            while filters and filters[-1] is None:
+                filters.pop()
+                self.counts.pop()
+
+            if len(self._free) > 2 * len(filters):
+                self._free = [free_id for free_id in self._free if free_id < len(filters)]
+                heapify(self._free)
+
+            return
+
+        heappush(self._free, filter_id)
+
+
+filter_registry = FilterRegistry()
+
+
+class FilterMemo(MutableMapping):
+    """
+    The used_filters of a RoutingData. The results are kept in a bytearray
+    indexed by the filter id (0 - unknown, 1 - failed, 2 - passed), the
+    routers look them up by id without hashing the filters. It also works
+    as a mapping of filter -> bool for everything else, the filters without
+    an id are kept in a dict.
+
+    The result of a freed id is dropped when the id is given to another
+    filter (see FilterRegistry.epoch), it could belong to the old one.
+    """
+
+    __slots__ = (
+        "results",
+        "epoch",
+        "_other"
+    )
+
+    def __init__(self, results: Optional[Any] = None):
+        # grows on demand up to the biggest id in use
+        self.results = bytearray()
+        self.epoch = filter_registry.epoch
+
+        self._other: Optional[dict["FilterProtocol", bool]] = None
+
+        if results:
+            self.update(results)
+
+    def reserve(self, size: int) -> bytearray:
+        """
+        Makes room for the ids below size and returns the results
+        :param size:
+        :return:
+        """
+        results = self.results
+
+        if self.epoch != filter_registry.epoch:
+            self._drop_reused()
+
+        if len(results) < size:
+            results.extend(bytes(size - len(results)))
+
+        return results
+
+    def _drop_reused(self):
+        results = self.results
+
+        # the epoch first, the registry can change in another thread
+        epoch = filter_registry.epoch
+        offset, reused = filter_registry.reused
+
+        if self.epoch < offset:
+            results[:] = bytes(len(results))
+
+        else:
+            for filter_id in reused[self.epoch - offset:epoch - offset]:
+                if filter_id < len(results):
+                    results[filter_id] = UNKNOWN
+
+        self.epoch = epoch
+
+    def __getitem__(self, filter_: "FilterProtocol") -> bool:
+        filter_id = filter_registry.ids.get(filter_, None)
+
+        if filter_id is None:
+            if self._other is None:
+                raise KeyError(filter_)
+
+            return self._other[filter_]
+
+        results = self.reserve(0)
+
+        if filter_id >= len(results) or not results[filter_id]:
+            raise KeyError(filter_)
+
+        return results[filter_id] == PASSED
+
+    def __setitem__(self, filter_: "FilterProtocol", value: Any):
+        filter_id = filter_registry.ids.get(filter_, None)
+
+        if filter_id is None:
+            if self._other is None:
+                self._other = {}
+
+            self._other[filter_] = bool(value)
+            return
+
+        self.reserve(filter_id + 1)[filter_id] = PASSED if value else FAILED
+
+    def __delitem__(self, filter_: "FilterProtocol"):
+        filter_id = filter_registry.ids.get(filter_, None)
+
+        if filter_id is None:
+            if self._other is None:
+                raise KeyError(filter_)
+
+            del self._other[filter_]
+            return
+
+        results = self.reserve(0)
+
+        if filter_id >= len(results) or not results[filter_id]:
+            raise KeyError(filter_)
+
+        results[filter_id] = UNKNOWN
+
+    def __iter__(self) -> Iterator["FilterProtocol"]:
+        filters = filter_registry.filters
+
+        for filter_id, result in enumerate(self.reserve(0)):
+            # the results of the freed ids are left until the ids are reused
+            if result and filter_id < len(filters) and filters[filter_id] is not None:
+                yield filters[filter_id]
+
+        if self._other:
+            yield from self._other
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def clear(self):
+        self.results[:] = bytes(len(self.results))
+        self.epoch = filter_registry.epoch
+        self._other = None
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self.items())!r})"
@@ -0,0 +1,90 @@
+from typing import Callable, Optional
+from functools import partial
+
+from dataclasses import dataclass
+
+from silvanus.routing.simple import SimpleRouter
+from silvanus.structures.base import RoutingData, RouterProtocol
+from silvanus.strategy.routers import (
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    FirstNTrueRouterIterator,
+    BestFirstRouterIterator,
+    ParallelAllTrueRouterIterator
+)
+
+
+# every iterator, for the tests of the routers that walk their subtree
+# themselves below a SimpleRouter
+ITERATORS = [
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    partial(FirstNTrueRouterIterator, count=2),
+    partial(FirstNTrueRouterIterator, count=5),
+    ParallelAllTrueRouterIterator,
+    BestFirstRouterIterator
+]
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ValueFilter:
+    value: int
+
+    async def __call__(self, data: RoutingData) -> bool:
+        data.filters_data["used"] = data.filters_data.get("used", 0) + 1
+
+        return data.request_data["value"] == self.value
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class CountMiddleware:
+    name: str
+
+    async def __call__(self, data: RoutingData):
+        data.middleware_data[self.name] = data.middleware_data.get(self.name, 0) + 1
+
+
+def get_tree(*routers: RouterProtocol) -> SimpleRouter:
+    """
+    A tree with middlewares, inner middlewares and filters on several
+    levels, the routers are added after the two first branches
+    """
+    root = SimpleRouter(middlewares=[CountMiddleware(name="root")])
+
+    first = SimpleRouter(
+        filters=[ValueFilter(value=1)],
+        inner_middlewares=[CountMiddleware(name="first_inner")]
+    )
+    first.add_routers(
+        [
+            SimpleRouter(filters=[ValueFilter(value=1)], data="first_1"),
+            SimpleRouter(filters=[ValueFilter(value=2)], data="first_2"),
+            SimpleRouter(data="first_3", middlewares=[CountMiddleware(name="first_3")])
+        ]
+    )
+
+    second = SimpleRouter(data="second", filters=[ValueFilter(value=2)])
+    second.add_router(
+        SimpleRouter(
+            data="second_nested",
+            inner_middlewares=[CountMiddleware(name="second_inner")]
+        )
+    )
+
+    root.add_routers([first, second, *routers])
+
+    return root
+
+
+def get_nested_tree(wrap: Optional[Callable[[SimpleRouter], RouterProtocol]] = None) -> SimpleRouter:
+    """
+    A SimpleRouter with a subtree wrapped by wrap (e.g. compiled) and a
+    sibling after it
+    """
+    inner = SimpleRouter(filters=[ValueFilter(value=1)])
+    inner.add_routers([SimpleRouter(data=name) for name in ["a", "b", "c"]])
+
+    root = SimpleRouter()
+    root.add_routers([inner if wrap is None else wrap(inner), SimpleRouter(data="d")])
+
+    return root
@@ -0,0 +1,197 @@
+import asyncio
+
+from dataclasses import dataclass
+
+from silvanus.integration.http import parse_path, get_path_filters
+from silvanus.routing.cache import CachedRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import (
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    FirstNTrueRouterIterator,
+    ParallelAllTrueRouterIterator
+)
+
+from helpers import CountMiddleware
+
+
+class CountFilter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, data: RoutingData) -> bool:
+        self.calls += 1
+        return True
+
+
+def request_key(data: RoutingData):
+    return data.request_data["request_method"], tuple(data.request_data["request_path_strings"])
+
+
+def get_router(count_filter: CountFilter) -> SimpleRouter:
+    root = SimpleRouter(middlewares=[CountMiddleware(name="root")])
+
+    user = SimpleRouter(
+        filters=get_path_filters("/user/{id:int}", {}, method="GET") + [count_filter],
+        data="user",
+        inner_middlewares=[CountMiddleware(name="inner")]
+    )
+    post = SimpleRouter(
+        filters=get_path_filters("/post/{id:int}", {}, method="GET"),
+        middlewares=[CountMiddleware(name="post")],
+        data="post"
+    )
+
+    root.add_routers([post, user])
+
+    return root
+
+
+async def test_cached_router():
+    count_filter = CountFilter()
+    router = get_router(count_filter)
+    cached = CachedRouter(router, key=request_key)
+
+    expected = parse_path("/user/10", app_data={}, method="GET")
+    assert await router.route(expected, FirstTrueRouterIterator()) == "user"
+    assert count_filter.calls == 1
+
+    for calls in range(3):
+        data = parse_path("/user/10", app_data={}, method="GET")
+
+        assert await cached.route(data, FirstTrueRouterIterator()) == "user"
+        assert data == expected
+
+    assert count_filter.calls == 2
+    assert (cached.hits, cached.misses) == (2, 1)
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+
+    assert cached.route_sync(data, FirstTrueRouterIterator()) == "user"
+    assert data == expected
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+
+    assert await cached.route(data, AllTrueRouterIterator()) == ["user"]
+    assert (cached.hits, cached.misses) == (3, 2)
+
+
+async def test_cached_router_nothing():
+    router = get_router(CountFilter())
+    cached = CachedRouter(router, key=request_key)
+
+    for _ in range(2):
+        data = parse_path("/other", app_data={}, method="GET")
+
+        assert await cached.route(data, FirstTrueRouterIterator(on_nothing=1)) == 1
+        assert data.middleware_data == {"root": 1, "post": 1}
+
+    assert (cached.hits, cached.misses) == (1, 1)
+
+
+async def test_cached_router_invalidation():
+    router = get_router(CountFilter())
+    cached = CachedRouter(router, key=request_key, maxsize=1)
+
+    for path in ["/user/1", "/user/2", "/user/1"]:
+        await cached.route(parse_path(path, app_data={}, method="GET"), FirstTrueRouterIterator())
+
+    assert (cached.hits, cached.misses) == (0, 3)
+
+    await cached.route(parse_path("/user/1", app_data={}, method="GET"), FirstTrueRouterIterator())
+    assert cached.hits == 1
+
+    router.routers[0].add_router(SimpleRouter(data="new"))
+
+    data = parse_path("/user/1", app_data={}, method="GET")
+
+    assert await cached.route(data, FirstTrueRouterIterator()) == "user"
+    assert (cached.hits, cached.misses) == (1, 4)
+
+
+async def test_cached_router_nested():
+    count_filter = CountFilter()
+
+    inner = SimpleRouter(filters=[count_filter])
+    inner.add_routers([SimpleRouter(data=name) for name in ["a", "b"]])
+
+    cached = CachedRouter(inner, key=request_key)
+
+    root = SimpleRouter()
+    root.add_routers([cached, SimpleRouter(data="c")])
+
+    def get_data() -> RoutingData:
+        return parse_path("/user/10", app_data={}, method="GET")
+
+    for _ in range(3):
+        assert await root.route(get_data(), AllTrueRouterIterator()) == ["a", "b", "c"]
+        assert root.route_sync(get_data(), AllTrueRouterIterator()) == ["a", "b", "c"]
+
+        # the added results depend on the results before, not cached
+        assert await root.route(get_data(), FirstNTrueRouterIterator(count=1)) == ["a"]
+
+    # one miss and three limited calls
+    assert count_filter.calls == 4
+    assert cached.hits == 5
+
+
+async def test_cached_router_first_n():
+    router = SimpleRouter()
+    router.add_routers([SimpleRouter(data=index) for index in range(1, 6)])
+
+    cached = CachedRouter(router, key=request_key)
+
+    for count in [1, 4, 1, 4]:
+        data = parse_path("/user/10", app_data={}, method="GET")
+
+        assert await cached.route(data, FirstNTrueRouterIterator(count=count)) == list(range(1, count + 1))
+
+    assert cached.hits == 2
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class SleepMiddleware:
+    name: str
+    delay: float
+
+    async def __call__(self, data: RoutingData):
+        await asyncio.sleep(self.delay)
+        data.middleware_data[self.name] = data.middleware_data.get(self.name, 0) + 1
+
+
+async def test_cached_router_parallel():
+    root = SimpleRouter()
+
+    for name, delay in [("a", 0.02), ("b", 0.01)]:
+        router = SimpleRouter(middlewares=[SleepMiddleware(name=name, delay=delay)], data=name)
+        root.add_router(CachedRouter(router, key=request_key))
+
+    for _ in range(3):
+        data = parse_path("/user/10", app_data={}, method="GET")
+
+        assert await root.route(data, ParallelAllTrueRouterIterator()) == ["a", "b"]
+        assert data.middleware_data == {"a": 1, "b": 1}
+
+
+async def test_cached_router_other_tree():
+    router = get_router(CountFilter())
+    cached = CachedRouter(router, key=request_key)
+
+    other = SimpleRouter()
+    leaf = SimpleRouter()
+    router.routers[1].add_router(leaf)
+
+    for _ in range(3):
+        await cached.route(parse_path("/user/1", app_data={}, method="GET"), FirstTrueRouterIterator())
+
+        # the changes of the other trees don't clear the cache
+        other.add_router(SimpleRouter(data="other"))
+
+    assert (cached.hits, cached.misses) == (2, 1)
+
+    # a change deep in the subtree does
+    leaf.add_filter(CountFilter())
+    await cached.route(parse_path("/user/1", app_data={}, method="GET"), FirstTrueRouterIterator())
+
+    assert (cached.hits, cached.misses) == (2, 2)
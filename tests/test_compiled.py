@@ -0,0 +1,107 @@
+import copy
+
+from functools import partial
+
+import pytest
+
+from silvanus.integration.http import parse_path, get_path_filters, TrieRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import (
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    FirstNTrueRouterIterator
+)
+
+from helpers import ITERATORS, ValueFilter, get_tree, get_nested_tree
+
+
+@pytest.mark.parametrize("value", [1, 2, 3])
+@pytest.mark.parametrize(
+    "iterator",
+    [FirstTrueRouterIterator, AllTrueRouterIterator, partial(FirstNTrueRouterIterator, count=2)]
+)
+async def test_compiled_same_as_tree(value, iterator):
+    router = get_tree(SimpleRouter(data="fallback"))
+    compiled = router.compile()
+
+    data = RoutingData(request_data={"value": value})
+    compiled_data = copy.deepcopy(data)
+
+    result = await router.route(data, iterator())
+    compiled_result = await compiled.route(compiled_data, iterator())
+
+    assert result == compiled_result
+    assert data == compiled_data
+
+    sync_data = RoutingData(request_data={"value": value})
+
+    assert compiled.route_sync(sync_data, iterator()) == result
+    assert sync_data == data
+
+
+async def test_compiled_nothing():
+    router = SimpleRouter(filters=[ValueFilter(value=1)], data="result")
+    compiled = router.compile()
+
+    data = RoutingData(request_data={"value": 2})
+
+    assert await compiled.route(data, FirstTrueRouterIterator(on_nothing=1)) == 1
+    assert await compiled.route(data, AllTrueRouterIterator(on_nothing=1)) == 1
+
+
+async def test_compiled_foreign_router():
+    trie_router = TrieRouter()
+    trie_router.add_path("/user/{id:int}", SimpleRouter(data="trie"), method="GET")
+
+    router = SimpleRouter()
+    router.add_routers(
+        [
+            SimpleRouter(filters=get_path_filters("/post/{id:int}", {}, method="GET"), data="post"),
+            trie_router
+        ]
+    )
+    compiled = router.compile()
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+
+    assert await compiled.route(data, FirstTrueRouterIterator()) == "trie"
+    assert data.filters_data == {"id": 10}
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+
+    assert await compiled.route(data, AllTrueRouterIterator()) == ["trie"]
+
+
+@pytest.mark.parametrize("iterator", ITERATORS)
+async def test_compiled_nested(iterator):
+    for value in [1, 2]:
+        expected = await get_nested_tree().route(RoutingData(request_data={"value": value}), iterator())
+        result = await get_nested_tree(SimpleRouter.compile).route(
+            RoutingData(request_data={"value": value}),
+            iterator()
+        )
+
+        assert result == expected
+
+        assert get_nested_tree(SimpleRouter.compile).route_sync(
+            RoutingData(request_data={"value": value}),
+            iterator()
+        ) == expected
+
+
+def test_compiled_drops_guaranteed_filters():
+    router = SimpleRouter(filters=[ValueFilter(value=1)])
+    router.add_router(SimpleRouter(filters=[ValueFilter(value=1), ValueFilter(value=2)]))
+
+    compiled = router.compile()
+
+    assert compiled.nodes[1].filters == (ValueFilter(value=2), )
+
+
+def test_compiled_cycle():
+    router = SimpleRouter()
+    router.add_router(router)
+
+    with pytest.raises(ValueError):
+        router.compile()
@@ -0,0 +1,107 @@
+from dataclasses import dataclass
+
+from silvanus.integration.duck import BaseFilter, filter_fix, EventRouter, get_event_data
+from silvanus.routing.simple import SimpleRouter
+from silvanus.strategy.routers import FirstTrueRouterIterator, AllTrueRouterIterator
+
+
+@dataclass
+class Event:
+    text: str
+
+
+class Message(Event):
+    pass
+
+
+class Command(Message):
+    pass
+
+
+class Other:
+    pass
+
+
+class TextFilter(BaseFilter):
+    def __init__(self, text: str):
+        self.text = text
+
+    @filter_fix
+    def __call__(self, event: Event) -> bool:
+        return event.text == self.text
+
+
+def test_base_filter_ids():
+    first = TextFilter("a")
+    second = TextFilter("a")
+
+    assert first != second
+    assert hash(first) != hash(second)
+    assert first == first
+
+    assert not hasattr(BaseFilter, "__current_id__")
+
+
+async def test_base_filter_memo():
+    first = TextFilter("a")
+    second = TextFilter("b")
+
+    router = SimpleRouter()
+    router.add_routers(
+        [
+            SimpleRouter(filters=[first], data="a"),
+            SimpleRouter(filters=[second], data="b"),
+        ]
+    )
+
+    data = get_event_data(Event(text="b"), app_data={})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "b"
+    assert data.used_filters == {first: False, second: True}
+
+
+async def test_event_router():
+    router = EventRouter()
+
+    router.subscribe(Event, SimpleRouter(data="event"))
+    router.subscribe(Command, SimpleRouter(data="command"))
+    router.add_router(SimpleRouter(data="always"))
+    router.subscribe(Message, SimpleRouter(filters=[TextFilter("hi")], data="message"))
+
+    async def route(event) -> list[str]:
+        return await router.route(get_event_data(event, app_data={}), AllTrueRouterIterator())
+
+    assert await route(Command(text="hi")) == ["event", "command", "always", "message"]
+    assert await route(Command(text="bye")) == ["event", "command", "always"]
+    assert await route(Message(text="hi")) == ["event", "always", "message"]
+    assert await route(Other()) == ["always"]
+
+    assert router.select_routers(get_event_data(Event(text=""), {})) is router.select_routers(
+        get_event_data(Event(text="other"), {})
+    )
+
+    router.subscribe(Other, SimpleRouter(data="other"))
+
+    assert await route(Other()) == ["always", "other"]
+    assert router.route_sync(get_event_data(Other(), app_data={}), FirstTrueRouterIterator()) == "always"
+
+    datas = [get_event_data(event, app_data={}) for event in [Event(text="hi"), Other(), Command(text="hi")]]
+
+    assert await router.route_many(datas, AllTrueRouterIterator()) == [
+        ["event", "always"],
+        ["always", "other"],
+        ["event", "command", "always", "message"]
+    ]
+
+
+async def test_event_router_options():
+    bus = EventRouter(index_key="event", adaptive_interval=10, priority=2)
+    bus.subscribe(Event, SimpleRouter(data="event"))
+
+    assert bus.index_key == "event"
+    assert bus.filter_profile is not None
+    assert bus.priority == 2
+
+    data = get_event_data(Event(text="a"), app_data={})
+
+    assert await bus.route(data, AllTrueRouterIterator()) == ["event"]
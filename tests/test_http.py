@@ -1,14 +1,23 @@
+import pytest
+
 from silvanus.integration.http import (
     parse_path,
+    PathSegments,
     PathFilter,
     TypeFilter,
     MethodFilter,
     LenghtFilter,
-    get_path_filters
+    get_path_filters,
+    TrieRouter,
+    RegexRouter
 )
 from silvanus.routing.simple import SimpleRouter
-from silvanus.structures.base import RoutingData
-from silvanus.strategy.routers import FirstTrueRouterIterator
+from silvanus.structures.base import RoutingData, RoutingDataPool
+from silvanus.strategy.routers import (
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    ParallelAllTrueRouterIterator
+)
 
 
 def test_parsing_simple():
@@ -178,3 +187,281 @@ async def test_filter_routing_different_method():
     assert data.filters_data == {}
 
     assert data.app_data["name"] == "tommy"
+
+
+@pytest.mark.parametrize("router_type", [TrieRouter, RegexRouter])
+async def test_trie_routing(router_type):
+    root_router = router_type()
+
+    root_router.add_path("/user/{id:int}", SimpleRouter(data="user_by_id"), method="GET")
+    root_router.add_path("/user/me", SimpleRouter(data="me"), method="GET")
+    root_router.add_path("/user/{name}", SimpleRouter(data="user_by_name"), method="GET")
+    root_router.add_path("/user/{id:int}", SimpleRouter(data="post_user"), method="POST")
+    root_router.add_path(
+        "/user/{id:int}/profile/{full:str}",
+        SimpleRouter(data="profile"),
+        method="GET"
+    )
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+    result = await root_router.route(data=data, iterator=FirstTrueRouterIterator())
+
+    assert result == "user_by_id"
+    assert data.filters_data == {"id": 10}
+
+    data = parse_path("/user/me", app_data={}, method="GET")
+    result = await root_router.route(data=data, iterator=AllTrueRouterIterator())
+
+    assert result == ["me", "user_by_name"]
+    assert data.filters_data == {"name": "me"}
+
+    data = parse_path("/user/1/profile/yes", app_data={}, method="GET")
+    result = await root_router.route(data=data, iterator=FirstTrueRouterIterator())
+
+    assert result == "profile"
+    assert data.filters_data == {"id": 1, "full": "yes"}
+
+    data = parse_path("/user/1", app_data={}, method="DELETE")
+    result = await root_router.route(data=data, iterator=FirstTrueRouterIterator())
+
+    assert result is None
+    assert data.filters_data == {}
+
+    data = parse_path("/user/10", app_data={}, method="POST")
+    result = root_router.route_sync(data=data, iterator=AllTrueRouterIterator())
+
+    assert result == ["post_user"]
+    assert data.filters_data == {"id": 10}
+
+
+@pytest.mark.parametrize("router_type", [TrieRouter, RegexRouter])
+async def test_trie_routing_same_as_filters(router_type):
+    paths = [
+        "/user/{id:int}",
+        "/user/{name}/{age:int}",
+        "/user/{name}/{height:float}",
+        "/post/{id:int}/comments",
+        "/post/latest/comments",
+        "/",
+    ]
+
+    trie_router = router_type()
+    simple_router = SimpleRouter()
+
+    for path in paths:
+        trie_router.add_path(path, SimpleRouter(data=path), method="GET")
+        simple_router.add_router(
+            SimpleRouter(filters=get_path_filters(path, {}, method="GET"), data=path)
+        )
+
+    requests = [
+        "/user/1",
+        "/user/tommy/10",
+        "/user/tommy/10.5",
+        "/post/1/comments",
+        "/post/latest/comments",
+        "/post/latest",
+        "/",
+    ]
+
+    expected = []
+
+    for request in requests:
+        trie_data = parse_path(request, app_data={}, method="GET")
+        simple_data = parse_path(request, app_data={}, method="GET")
+
+        result = await simple_router.route(simple_data, AllTrueRouterIterator())
+        expected.append(result)
+
+        assert await trie_router.route(trie_data, AllTrueRouterIterator()) == result
+
+    for router in [trie_router, simple_router]:
+        datas = [parse_path(request, app_data={}, method="GET") for request in requests]
+
+        assert await router.route_many(datas, AllTrueRouterIterator()) == expected
+
+
+def test_parse_path_pool():
+    pool = RoutingDataPool()
+
+    data = parse_path("/user/1", app_data={}, method="GET", pool=pool)
+    pool.release(data)
+
+    reused = parse_path("/post/2", app_data={}, method="POST", pool=pool)
+
+    assert reused is data
+    assert reused == parse_path("/post/2", app_data={}, method="POST")
+
+
+def test_parsing_lazy():
+    for path in ["/user/10/posts?page=2&sort=new#top", b"/user/10/posts?page=2&sort=new#top"]:
+        data = parse_path(path, app_data={}, method="GET", lazy=True)
+        segments = data.request_data["request_path_strings"]
+
+        assert isinstance(segments, PathSegments)
+        assert segments.source is path
+        assert data.request_data["request_len"] == 4
+        assert segments._strings is None
+
+        assert segments[2] == "10"
+        assert segments == ["", "user", "10", "posts"]
+        assert segments[1:] == ["user", "10", "posts"]
+
+        assert data.request_data["request_query"] == path[15:30]
+        assert data.request_data["request_fragment"] == path[31:]
+
+    view = memoryview(b"/user/10?#")
+    data = parse_path(view, app_data={}, method="GET", lazy=True)
+
+    assert data.request_data["request_path_strings"] == ["", "user", "10"]
+    assert bytes(data.request_data["request_query"]) == b""
+    assert bytes(data.request_data["request_fragment"]) == b""
+
+    data = parse_path("/", app_data={}, method="GET", lazy=True)
+
+    assert data.request_data["request_path_strings"] == ["", ""]
+    assert data.request_data["request_query"] is None
+    assert data.request_data["request_fragment"] is None
+
+
+async def test_routing_lazy():
+    router = SimpleRouter()
+
+    for path in ["/user/{id:int}", "/user/{name}/posts", "/about"]:
+        router.add_router(SimpleRouter(filters=get_path_filters(path, {}, method="GET"), data=path))
+
+    data = parse_path(b"/user/me/posts?page=1", app_data={}, method="GET", lazy=True)
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "/user/{name}/posts"
+    assert data.filters_data == {"name": "me"}
+
+    data = parse_path("/user/10#bottom", app_data={}, method="GET", lazy=True)
+
+    assert await router.route(data, AllTrueRouterIterator()) == ["/user/{id:int}"]
+    assert data.filters_data == {"id": 10}
+
+
+async def test_type_filter_conversion_cache():
+    conversions = []
+
+    def user_id(value: str) -> int:
+        conversions.append(value)
+
+        return int(value)
+
+    router = SimpleRouter()
+
+    for action in ["posts", "comments", "likes", "edit"]:
+        router.add_router(
+            SimpleRouter(
+                filters=[
+                    TypeFilter(index=2, name="id", value_type=user_id),
+                    PathFilter(index=3, text=action)
+                ],
+                data=action
+            )
+        )
+
+    data = parse_path("/user/10/likes", app_data={}, method="GET")
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "likes"
+    assert data.filters_data == {"id": 10}
+    assert conversions == ["10"]
+
+    data = parse_path("/user/me/likes", app_data={}, method="GET")
+
+    assert await router.route(data, AllTrueRouterIterator()) == []
+    assert conversions == ["10", "me"]
+
+    other = TypeFilter(index=2, name="other", value_type=user_id)
+    data = parse_path("/user/5/likes", app_data={}, method="GET")
+
+    assert TypeFilter(index=2, name="id", value_type=user_id)(data)
+    assert other(data)
+    assert data.filters_data == {"id": 5, "other": 5}
+    assert conversions == ["10", "me", "5"]
+
+
+def get_regex_router(any_router: SimpleRouter) -> RegexRouter:
+    router = RegexRouter()
+
+    router.add_router(any_router)
+    router.add_path("/item/{id:int}", SimpleRouter(data="by_id"), method="GET")
+    router.add_path("/item/{value:float}", SimpleRouter(data="by_value"), method="GET")
+    router.add_router(SimpleRouter(data="always"))
+    router.add_path("/item/{name}", SimpleRouter(data="by_name"), method="GET")
+
+    return router
+
+
+async def test_regex_routing():
+    router = get_regex_router(
+        SimpleRouter(filters=[lambda data: data.request_data["request_len"] == 3], data="any")
+    )
+
+    data = parse_path(b"/item/1.5?full=1", app_data={}, method="GET", lazy=True)
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "any"
+    assert await router.route(
+        parse_path("/item/1_000", app_data={}, method="GET"),
+        AllTrueRouterIterator()
+    ) == ["any", "by_id", "by_value", "always", "by_name"]
+
+    router = get_regex_router(SimpleRouter())
+
+    data = parse_path("/item/1.5", app_data={}, method="GET")
+
+    assert router.route_sync(data, FirstTrueRouterIterator()) == "by_value"
+    assert data.filters_data == {"value": 1.5}
+
+    data = parse_path("/item/one", app_data={}, method="GET")
+
+    assert await router.route(data, ParallelAllTrueRouterIterator()) == ["always", "by_name"]
+    assert data.filters_data == {"name": "one"}
+
+    data = parse_path("/item/1", app_data={}, method="POST")
+
+    assert await router.route(data, AllTrueRouterIterator()) == ["always"]
+
+
+async def test_adaptive_path_filters():
+    router = SimpleRouter(filters=get_path_filters("/a/b/c", {}, method="GET"), data="c", adaptive_interval=10)
+
+    for index in range(20):
+        assert await router.route(parse_path(f"/a/b/x{index}", app_data={}, method="GET"), FirstTrueRouterIterator()) is None
+
+    # the path filters may be checked before the lenght now
+    assert await router.route(parse_path("/a/b", app_data={}, method="GET"), FirstTrueRouterIterator()) is None
+    assert await router.route(parse_path("/a/b/c", app_data={}, method="GET"), FirstTrueRouterIterator()) == "c"
+
+
+async def test_filter_result():
+    data = parse_path("/this/1234", app_data={}, method="GET")
+
+    for filter_, expected in [
+        (PathFilter(index=1, text="this"), True),
+        (PathFilter(index=5, text="this"), False),
+        (MethodFilter(method="POST"), False),
+        (LenghtFilter(lenght=3), True)
+    ]:
+        result = filter_(data)
+
+        # taken as a bool by the routers, awaitable for the old callers
+        assert bool(result) is expected
+        assert result == expected
+        assert (await result) is expected
+        assert (await filter_(data)) is expected
+
+
+@pytest.mark.parametrize("router_type", [TrieRouter, RegexRouter])
+async def test_trie_router_options(router_type):
+    router = router_type(data="root", priority=5, concurrent_filters=True, adaptive_interval=10)
+    router.add_path("/user/{id:int}", SimpleRouter(data="user", priority=1), method="GET")
+
+    assert (router.priority, router.priority_bound) == (5, 5)
+    assert router.concurrent_filters
+    assert router.filter_profile is not None
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+
+    assert await router.route(data, AllTrueRouterIterator()) == ["root", "user"]
@@ -0,0 +1,204 @@
+import os
+import time
+import asyncio
+import threading
+
+from dataclasses import dataclass
+from typing import ClassVar
+
+import pytest
+
+from silvanus.routing.simple import SimpleRouter
+from silvanus.routing.stack import StackRouter
+from silvanus.routing.cache import CachedRouter
+from silvanus.routing.metrics import RoutingMetrics
+from silvanus.routing.offload import ProcessFilterPool, BlockingPool
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import FirstTrueRouterIterator, AllTrueRouterIterator
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class ProcessFilter:
+    value: int
+    parent_pid: int
+
+    cpu_bound: ClassVar[bool] = True
+    request_keys: ClassVar[tuple[str, ...]] = ("value", )
+
+    def __call__(self, data: RoutingData) -> bool:
+        # only the requested keys are sent to the process
+        assert set(data.request_data) <= {"value"}
+
+        return os.getpid() != self.parent_pid and data.request_data["value"] == self.value
+
+
+@pytest.fixture(scope="module")
+def pool():
+    with ProcessFilterPool(max_workers=2, warmup=True) as pool:
+        yield pool
+
+
+def get_tree() -> SimpleRouter:
+    root = SimpleRouter()
+    root.add_routers(
+        [
+            SimpleRouter(filters=[ProcessFilter(value=1, parent_pid=os.getpid())], data="first"),
+            SimpleRouter(filters=[ProcessFilter(value=2, parent_pid=os.getpid())], data="second")
+        ]
+    )
+
+    return root
+
+
+async def test_process_filters(pool):
+    router = get_tree()
+    router.set_cpu_pool(pool)
+
+    data = RoutingData(request_data={"value": 2, "connection": object()})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "second"
+    assert dict(data.used_filters) == {
+        ProcessFilter(value=1, parent_pid=os.getpid()): False,
+        ProcessFilter(value=2, parent_pid=os.getpid()): True
+    }
+
+    datas = [RoutingData(request_data={"value": value}) for value in [1, 2, 3]]
+
+    assert await router.route_many(datas, AllTrueRouterIterator()) == [["first"], ["second"], []]
+
+    router.set_cpu_pool(None)
+
+    # without the pool the filters run in place
+    assert await router.route(RoutingData(request_data={"value": 2}), FirstTrueRouterIterator()) is None
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class BlockingMiddleware:
+    name: str
+    delay: float = 0
+
+    blocking: ClassVar[bool] = True
+
+    def __call__(self, data: RoutingData):
+        time.sleep(self.delay)
+        data.middleware_data[self.name] = threading.current_thread() is not threading.main_thread()
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class BlockingFilter:
+    value: int
+
+    blocking: ClassVar[bool] = True
+
+    def __call__(self, data: RoutingData) -> bool:
+        return threading.current_thread() is not threading.main_thread() and data.request_data["value"] == self.value
+
+
+def get_blocking_tree(delay: float = 0) -> SimpleRouter:
+    root = SimpleRouter(
+        middlewares=[BlockingMiddleware(name="root", delay=delay)],
+        inner_middlewares=[BlockingMiddleware(name="inner")]
+    )
+    root.add_routers(
+        [
+            SimpleRouter(filters=[BlockingFilter(value=1)], data="first"),
+            SimpleRouter(filters=[BlockingFilter(value=2)], data="second")
+        ]
+    )
+
+    return root
+
+
+@pytest.mark.parametrize("stack", [False, True])
+async def test_blocking(stack):
+    with BlockingPool(max_workers=4) as pool:
+        router = get_blocking_tree()
+        router.set_blocking_pool(pool)
+
+        if stack:
+            router = StackRouter(router)
+
+        data = RoutingData(request_data={"value": 2})
+
+        assert await router.route(data, FirstTrueRouterIterator()) == "second"
+        assert data.middleware_data == {"root": True, "inner": True}
+
+        data = RoutingData(request_data={"value": 2})
+
+        # route_sync calls them in place
+        assert router.route_sync(data, FirstTrueRouterIterator()) is None
+        assert data.middleware_data == {"root": False, "inner": False}
+
+
+async def test_blocking_concurrency():
+    with BlockingPool(max_workers=4) as pool:
+        router = get_blocking_tree(delay=0.05)
+        router.set_blocking_pool(pool)
+
+        started = asyncio.get_running_loop().time()
+
+        results = await asyncio.gather(
+            *[router.route(RoutingData(request_data={"value": 1}), FirstTrueRouterIterator()) for _ in range(4)]
+        )
+
+        assert results == ["first"] * 4
+        assert asyncio.get_running_loop().time() - started < 0.15
+
+        datas = [RoutingData(request_data={"value": value}) for value in [1, 2, 3]]
+
+        assert await router.route_many(datas, FirstTrueRouterIterator()) == ["first", "second", None]
+
+
+async def test_blocking_timeout():
+    with BlockingPool(max_workers=1, timeout=0.01) as pool:
+        router = get_blocking_tree(delay=0.1)
+        router.set_blocking_pool(pool)
+
+        with pytest.raises(TimeoutError):
+            await router.route(RoutingData(request_data={"value": 1}), FirstTrueRouterIterator())
+
+
+@pytest.mark.parametrize("stack", [False, True])
+async def test_blocking_observed(stack):
+    metrics = RoutingMetrics()
+    blocking = BlockingFilter(value=1)
+
+    root = SimpleRouter(filters=[blocking], adaptive_interval=100)
+    root.add_router(SimpleRouter(filters=[blocking], data="result"))
+
+    with BlockingPool(max_workers=2) as pool:
+        root.set_blocking_pool(pool)
+        root.set_metrics(metrics)
+
+        router = StackRouter(root) if stack else root
+
+        for value in [1, 2]:
+            await router.route(RoutingData(request_data={"value": value}), FirstTrueRouterIterator())
+
+    # the filters checked in the pool are measured and profiled too
+    filter_snapshot = metrics.snapshot()["filters"][repr(blocking)]
+
+    assert (filter_snapshot["calls"], filter_snapshot["failed"], filter_snapshot["memo_hits"]) == (2, 1, 1)
+    assert (root.filter_profile.stats[blocking].calls, root.filter_profile.stats[blocking].rejections) == (2, 1)
+
+
+@pytest.mark.parametrize(
+    "wrapper",
+    [StackRouter, lambda router: CachedRouter(router, key=lambda data: data.request_data["value"])],
+    ids=["stack", "cached"]
+)
+async def test_pools_through_wrappers(pool, wrapper):
+    root = SimpleRouter()
+    root.add_routers(
+        [
+            wrapper(get_tree()),
+            wrapper(SimpleRouter(filters=[BlockingFilter(value=3)], data="blocking"))
+        ]
+    )
+
+    with BlockingPool(max_workers=2) as blocking_pool:
+        root.set_cpu_pool(pool)
+        root.set_blocking_pool(blocking_pool)
+
+        for value, expected in [(2, "second"), (3, "blocking")]:
+            assert await root.route(RoutingData(request_data={"value": value}), FirstTrueRouterIterator()) == expected
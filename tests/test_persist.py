@@ -0,0 +1,121 @@
+import pytest
+
+from silvanus.integration.http import parse_path, get_path_filters, TrieRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.routing.compiled import CompiledRouter
+from silvanus.routing.persist import get_fingerprint, dump_router, load_router
+from silvanus.structures.base import RoutingData
+from silvanus.structures.memo import filter_registry
+from silvanus.strategy.routers import FirstTrueRouterIterator, AllTrueRouterIterator
+
+from helpers import CountMiddleware
+
+
+def user_handler():
+    pass
+
+
+ROUTES = [
+    ("/user/{id:int}", "GET", user_handler),
+    ("/user/{name}", "GET", user_handler),
+    ("/post/{id:int}", "POST", CountMiddleware),
+]
+
+
+def get_tree() -> SimpleRouter:
+    root = SimpleRouter(middlewares=[CountMiddleware(name="root")])
+
+    api = SimpleRouter(inner_middlewares=[CountMiddleware(name="inner")])
+    root.add_router(api)
+
+    for path, method, handler in ROUTES:
+        api.add_router(SimpleRouter(filters=get_path_filters(path, {}, method=method), data=handler))
+
+    trie = TrieRouter()
+    trie.add_path("/trie/{id:int}", SimpleRouter(data="trie"), method="GET")
+    root.add_router(trie)
+
+    return root
+
+
+async def test_dump_and_load(tmp_path):
+    fingerprint = get_fingerprint(ROUTES)
+    path = tmp_path / "routes.plan"
+
+    tree = get_tree()
+    dump_router(tree, path, fingerprint)
+
+    loaded = load_router(path, fingerprint)
+
+    assert isinstance(loaded, CompiledRouter)
+    assert len(loaded.nodes) == len(tree.compile().nodes)
+
+    for node in loaded.nodes:
+        assert node.filter_ids == tuple(filter_registry.ids[filter_] for filter_ in node.filters)
+
+    for request, method in [("/user/10", "GET"), ("/user/me", "GET"), ("/post/1", "POST"), ("/trie/2", "GET")]:
+        for iterator in [FirstTrueRouterIterator(), AllTrueRouterIterator()]:
+            expected = parse_path(request, app_data={}, method=method)
+            data = parse_path(request, app_data={}, method=method)
+
+            assert await loaded.route(data, iterator) == await tree.route(expected, iterator)
+            assert data == expected
+
+
+def test_load_other_fingerprint(tmp_path):
+    path = tmp_path / "routes.plan"
+
+    assert load_router(path, get_fingerprint(ROUTES)) is None
+
+    dump_router(get_tree(), path, get_fingerprint(ROUTES))
+
+    assert load_router(path, get_fingerprint(ROUTES[:-1])) is None
+    assert load_router(path, get_fingerprint(ROUTES)) is not None
+
+
+def test_fingerprint():
+    assert get_fingerprint(ROUTES) == get_fingerprint(list(ROUTES))
+    assert get_fingerprint([{"b": 1, "a": user_handler}]) == get_fingerprint([{"a": user_handler, "b": 1}])
+    assert get_fingerprint(ROUTES) != get_fingerprint(reversed(ROUTES))
+
+    with pytest.raises(TypeError):
+        get_fingerprint([object()])
+
+
+@pytest.mark.parametrize("size", [0, 1, -1])
+def test_load_broken_file(tmp_path, size):
+    fingerprint = get_fingerprint(ROUTES)
+    path = tmp_path / "routes.plan"
+
+    dump_router(get_tree(), path, fingerprint)
+
+    content = path.read_bytes()
+    path.write_bytes(content[:size] if size >= 0 else content[:len(content) // 2])
+
+    assert load_router(path, fingerprint) is None
+
+
+def test_load_removed_object(tmp_path):
+    fingerprint = get_fingerprint(ROUTES)
+    path = tmp_path / "routes.plan"
+
+    dump_router(SimpleRouter(data=user_handler), path, fingerprint)
+    path.write_bytes(path.read_bytes().replace(b"user_handler", b"user_removed"))
+
+    assert load_router(path, fingerprint) is None
+
+
+def test_dump_replaces_file(tmp_path):
+    fingerprint = get_fingerprint(ROUTES)
+    path = tmp_path / "routes.plan"
+
+    dump_router(get_tree(), path, fingerprint)
+
+    with open(path, "rb") as file:
+        dump_router(SimpleRouter(data="new"), path, fingerprint)
+
+        # the old file is replaced, not rewritten
+        assert file.read() != path.read_bytes()
+
+    assert load_router(path, fingerprint).nodes[0].data == "new"
+    assert [item.name for item in tmp_path.iterdir()] == ["routes.plan"]
@@ -1,9 +1,16 @@
 import copy
+import asyncio
+import threading
 
+from typing import ClassVar
 from dataclasses import dataclass
 
+import pytest
+
 from silvanus.routing.simple import SimpleRouter
-from silvanus.structures.base import RoutingData
+from silvanus.routing.metrics import RoutingMetrics
+from silvanus.structures.base import RoutingData, RoutingDataPool
+from silvanus.structures.memo import FilterMemo, filter_registry
 from silvanus.strategy.routers import FirstTrueRouterIterator, AllTrueRouterIterator
 
 
@@ -491,3 +498,548 @@ async def test_nested_router_with_middleware():
             )
         }
     )
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class IndexedFilter:
+    num: int
+
+    index_key: ClassVar[str] = "num"
+
+    @property
+    def index_value(self) -> int:
+        return self.num
+
+    async def __call__(self, data: RoutingData) -> bool:
+        used = data.filters_data.get("used", 0) + 1
+        data.filters_data["used"] = used
+
+        return data.request_data["num"] == self.num
+
+
+async def test_indexed_router():
+    router = SimpleRouter(index_key="num")
+
+    router.add_routers(
+        [
+            SimpleRouter(filters=[IndexedFilter(num=num)], data=num)
+            for num in range(500)
+        ]
+    )
+    router.add_router(SimpleRouter(data="always"))
+    router.add_router(SimpleRouter(filters=[IndexedFilter(num=10), SimpleFilter()], data="second_ten"))
+
+    data = RoutingData(request_data={"num": 10, "simple": True})
+    result = await router.route(data, AllTrueRouterIterator())
+
+    assert result == [10, "always", "second_ten"]
+    assert data.filters_data["used"] == 2
+
+    data = RoutingData(request_data={"num": 1000})
+    result = await router.route(data, AllTrueRouterIterator())
+
+    assert result == ["always"]
+    assert data.filters_data == {}
+
+
+async def test_indexed_router_with_middleware():
+    router = SimpleRouter(index_key="num")
+
+    router.add_routers(
+        [
+            SimpleRouter(
+                filters=[IndexedFilter(num=1)],
+                middlewares=[ChangeDataMiddleware(simple=True, num=2, string="")],
+                data="changed"
+            ),
+            SimpleRouter(filters=[IndexedFilter(num=2)], data="two")
+        ]
+    )
+
+    data = RoutingData(request_data={"num": 1})
+    result = await router.route(data, FirstTrueRouterIterator())
+
+    assert result is None
+
+    data = RoutingData(request_data={"num": 2})
+    result = await router.route(data, FirstTrueRouterIterator())
+
+    assert result == "two"
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class SyncFilter:
+    num: int
+
+    def __call__(self, data: RoutingData) -> bool:
+        return data.request_data["num"] == self.num
+
+
+class SleepFilter:
+    async def __call__(self, data: RoutingData) -> bool:
+        await asyncio.sleep(0)
+        return True
+
+
+async def test_sync_filters():
+    router = SimpleRouter(
+        filters=[SyncFilter(num=1)],
+        middlewares=[ChangeDataMiddleware(simple=True, num=1, string="")]
+    )
+    router.add_routers(
+        [
+            SimpleRouter(filters=[SyncFilter(num=2)], data="two"),
+            SimpleRouter(filters=[SimpleFilter()], data="simple")
+        ]
+    )
+
+    data = RoutingData(request_data={"num": 2})
+    sync_data = RoutingData(request_data={"num": 2})
+
+    assert await router.route(data, AllTrueRouterIterator()) == ["simple"]
+    assert router.route_sync(sync_data, AllTrueRouterIterator()) == ["simple"]
+    assert data == sync_data
+
+
+def test_route_sync_suspended_filter():
+    router = SimpleRouter(filters=[SleepFilter()], data="result")
+
+    with pytest.raises(RuntimeError):
+        router.route_sync(RoutingData(), FirstTrueRouterIterator())
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class RemoteFilter:
+    delay: float
+    result: bool
+
+    concurrent: ClassVar[bool] = True
+
+    async def __call__(self, data: RoutingData) -> bool:
+        try:
+            await asyncio.sleep(self.delay)
+
+        except asyncio.CancelledError:
+            data.filters_data.setdefault("cancelled", []).append(self.delay)
+            raise
+
+        return self.result
+
+
+async def test_concurrent_filters():
+    filters = [RemoteFilter(delay=0.05 + index / 1000, result=True) for index in range(3)]
+    router = SimpleRouter(filters=filters, data="result")
+
+    data = RoutingData()
+
+    started = asyncio.get_running_loop().time()
+    result = await router.route(data, FirstTrueRouterIterator())
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == "result"
+    assert elapsed < 0.1
+    assert data.used_filters == {filter_: True for filter_ in filters}
+
+
+async def test_concurrent_filters_cancel():
+    false_filter = RemoteFilter(delay=0, result=False)
+
+    router = SimpleRouter(
+        filters=[RemoteFilter(delay=1, result=True), false_filter, SyncFilter(num=1)],
+        data="result"
+    )
+
+    data = RoutingData(request_data={"num": 1})
+    result = await router.route(data, FirstTrueRouterIterator())
+    await asyncio.sleep(0)
+
+    assert result is None
+    assert data.used_filters == {false_filter: False}
+    assert data.filters_data == {"cancelled": [1]}
+
+
+async def test_concurrent_router_option():
+    sleep_filter = SleepFilter()
+
+    router = SimpleRouter(
+        filters=[sleep_filter, SimpleFilter()],
+        concurrent_filters=True,
+        data="result"
+    )
+
+    data = RoutingData(request_data={"simple": True})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "result"
+    assert data.used_filters == {sleep_filter: True, SimpleFilter(): True}
+
+
+class BatchFilter:
+    def __init__(self, num: int):
+        self.num = num
+        self.batches = []
+
+    def __call__(self, data: RoutingData) -> bool:
+        return data.request_data["num"] >= self.num
+
+    def batch(self, datas: list[RoutingData]) -> list[int]:
+        self.batches.append(len(datas))
+
+        return [int(data.request_data["num"] >= self.num) for data in datas]
+
+
+@pytest.mark.parametrize("iterator", [FirstTrueRouterIterator(), AllTrueRouterIterator()])
+async def test_route_many(iterator):
+    batch_filter = BatchFilter(num=5)
+
+    def get_router() -> SimpleRouter:
+        router = SimpleRouter()
+
+        big = SimpleRouter(
+            filters=[batch_filter],
+            inner_middlewares=[ChangeDataMiddleware(simple=False, num=-1, string="")]
+        )
+        big.add_routers(
+            [
+                SimpleRouter(filters=[SyncFilter(num=7)], data="seven"),
+                SimpleRouter(data="big")
+            ]
+        )
+
+        router.add_routers(
+            [
+                big,
+                SimpleRouter(filters=[SyncFilter(num=1)], data="one"),
+                SimpleRouter(data="fallback")
+            ]
+        )
+        return router
+
+    datas = [RoutingData(request_data={"num": num, "simple": True}) for num in range(10)]
+    copies = copy.deepcopy(datas)
+
+    results = await get_router().route_many(datas, iterator)
+
+    assert batch_filter.batches == [10]
+    batch_filter.batches.clear()
+
+    expected = [await get_router().route(data, iterator) for data in copies]
+
+    assert results == expected
+    assert datas == copies
+
+
+class SlowFilter:
+    def __init__(self, result: bool):
+        self.result = result
+
+    def __call__(self, data: RoutingData) -> bool:
+        sum(range(1000))
+        return self.result
+
+
+class PinnedFilter:
+    pinned = True
+
+    def __call__(self, data: RoutingData) -> bool:
+        data.filters_data["pinned"] = True
+        return True
+
+
+async def test_adaptive_filters():
+    slow = SlowFilter(result=True)
+    pinned = PinnedFilter()
+    rejecting = SyncFilter(num=1)
+    last = SlowFilter(result=True)
+
+    router = SimpleRouter(filters=[slow, pinned, last, rejecting], data="result", adaptive_interval=10)
+
+    for num in range(9):
+        data = RoutingData(request_data={"num": num % 2})
+        await router.route(data, FirstTrueRouterIterator())
+
+    assert router.filters == [slow, pinned, last, rejecting]
+    assert router.filter_profile.stats[rejecting].calls == 9
+    assert router.filter_profile.stats[rejecting].rejections == 5
+
+    data = RoutingData(request_data={"num": 0})
+
+    assert router.route_sync(data, FirstTrueRouterIterator()) is None
+    assert router.filters == [slow, pinned, rejecting, last]
+    assert data.filters_data == {"pinned": True}
+
+
+async def test_metrics():
+    metrics = RoutingMetrics()
+
+    shared_filter = DataclassFilter(num=1, string="one")
+    middleware = ChangeDataMiddleware(simple=True, num=1, string="one")
+
+    router = SimpleRouter(name="root", middlewares=[middleware])
+    router.add_routers(
+        [
+            SimpleRouter(name="first", filters=[shared_filter, SyncFilter(num=2)]),
+            SimpleRouter(name="second", filters=[shared_filter], data="second")
+        ]
+    )
+    router.set_metrics(metrics)
+
+    data = RoutingData(request_data={"num": 0})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == "second"
+    assert router.route_sync(RoutingData(request_data={"num": 0}), FirstTrueRouterIterator()) == "second"
+
+    snapshot = metrics.snapshot()
+
+    assert {name: (value["calls"], value["passed"]) for name, value in snapshot["routers"].items()} == {
+        "root": (2, 2),
+        "first": (2, 0),
+        "second": (2, 2)
+    }
+
+    filter_snapshot = snapshot["filters"][repr(shared_filter)]
+
+    assert (filter_snapshot["calls"], filter_snapshot["memo_hits"]) == (2, 2)
+    assert snapshot["filters"][repr(SyncFilter(num=2))]["failed"] == 2
+    assert snapshot["middlewares"][repr(middleware)]["latency"]["count"] == 2
+
+    router.set_metrics(None)
+    metrics.reset()
+
+    await router.route(RoutingData(request_data={"num": 0}), FirstTrueRouterIterator())
+
+    assert metrics.snapshot() == {"routers": {}, "filters": {}, "middlewares": {}}
+
+
+async def test_lazy_routing_data():
+    data = RoutingData(request_data={"value": 1})
+
+    router = SimpleRouter(filters=[lambda data: data.request_data["value"] == 2])
+
+    assert await router.route(data, FirstTrueRouterIterator()) is None
+
+    assert data._filters_data is None
+    assert data._used_middlewares is None
+    assert data._inner_middlewares is None
+
+    assert data == RoutingData(request_data={"value": 1}, used_filters=data.used_filters)
+
+    data.filters_data["id"] = 1
+
+    assert data.filters_data == {"id": 1}
+    assert data != RoutingData(request_data={"value": 1}, used_filters=data.used_filters)
+
+
+async def test_routing_data_pool():
+    pool = RoutingDataPool(maxsize=1)
+
+    router = SimpleRouter(
+        middlewares=[ChangeDataMiddleware(simple=True, num=1, string="1")],
+        filters=[SimpleFilter()],
+        data=1
+    )
+
+    data = pool.acquire(request_data={})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == 1
+
+    filters_data = data.filters_data
+    pool.release(data)
+
+    with pytest.raises(ValueError):
+        pool.release(data)
+
+    assert len(pool) == 1
+
+    reused = pool.acquire(app_data={"app": True}, request_data={})
+
+    assert reused is data
+    assert reused.filters_data is filters_data
+    assert reused == RoutingData(app_data={"app": True})
+
+    assert await router.route(reused, FirstTrueRouterIterator()) == 1
+    assert reused.filters_data == {"used": 1}
+
+    pool.release(reused)
+    pool.release(RoutingData())
+
+    assert len(pool) == 1
+
+
+class HashCountingFilter:
+    hashes = 0
+
+    def __call__(self, data: RoutingData) -> bool:
+        return data.request_data["value"] == 1
+
+    def __hash__(self) -> int:
+        HashCountingFilter.hashes += 1
+
+        return hash(type(self))
+
+    def __eq__(self, other):
+        return isinstance(other, HashCountingFilter)
+
+
+async def test_filter_memo_by_id():
+    filter_ = HashCountingFilter()
+
+    router = SimpleRouter()
+    router.add_routers(
+        [
+            SimpleRouter(filters=[filter_], data="first"),
+            SimpleRouter(filters=[HashCountingFilter()], data="second"),
+        ]
+    )
+
+    HashCountingFilter.hashes = 0
+
+    data = RoutingData(request_data={"value": 1})
+
+    assert await router.route(data, AllTrueRouterIterator()) == ["first", "second"]
+    assert HashCountingFilter.hashes == 0
+
+    assert data.used_filters == {filter_: True}
+    assert filter_ in data.used_filters
+
+    del data.used_filters[filter_]
+
+    assert data.used_filters == {}
+    assert len(data.used_filters) == 0
+
+
+def test_filter_memo_mapping():
+    memo = FilterMemo({SimpleFilter(): True})
+    memo[DataclassFilter(num=1, string="1")] = 0
+
+    assert memo == {SimpleFilter(): True, DataclassFilter(num=1, string="1"): False}
+    assert memo.get(DataclassFilter(num=2, string="2"), None) is None
+
+    memo.clear()
+
+    assert not memo
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class IndexFilter:
+    index: int
+
+    def __call__(self, data: RoutingData) -> bool:
+        return True
+
+
+def test_filter_registry_releases():
+    used = len(filter_registry)
+    size = len(filter_registry.filters)
+
+    for index in range(10000):
+        SimpleRouter(filters=[IndexFilter(index=index)]).compile()
+
+    # the ids of the discarded routers are free again
+    assert len(filter_registry) == used
+    assert len(filter_registry.filters) <= size
+
+    router = SimpleRouter(filters=[IndexFilter(index=-1)])
+
+    assert router._filter_bound <= size + 1
+
+    data = RoutingData()
+    data.used_filters[IndexFilter(index=-1)] = False
+
+    del router
+    router = SimpleRouter(filters=[IndexFilter(index=-2)], data="result")
+
+    # the id of the released filter is given to the new one, its result is dropped
+    assert router.route_sync(data, FirstTrueRouterIterator()) == "result"
+    assert IndexFilter(index=-1) not in data.used_filters
+
+
+def test_filters_changed_in_place():
+    filters = []
+    router = SimpleRouter(filters=filters, data="result")
+
+    router.filters.append(SyncFilter(num=2))
+    router.filters.insert(0, SyncFilter(num=1))
+
+    assert router.route_sync(RoutingData(request_data={"num": 1}), FirstTrueRouterIterator()) is None
+
+    router.filters[1] = SyncFilter(num=1)
+
+    assert router.route_sync(RoutingData(request_data={"num": 1}), FirstTrueRouterIterator()) == "result"
+
+    del router.filters[:]
+    router.filters += [SyncFilter(num=3)]
+
+    assert router.route_sync(RoutingData(request_data={"num": 1}), FirstTrueRouterIterator()) is None
+
+    # the list given to the router is copied
+    filters.append(SyncFilter(num=1))
+
+    assert router.filters == [SyncFilter(num=3)]
+
+    router.filters = [SyncFilter(num=1)]
+
+    assert router.route_sync(RoutingData(request_data={"num": 1}), FirstTrueRouterIterator()) == "result"
+    assert copy.deepcopy(router).route_sync(RoutingData(request_data={"num": 2}), FirstTrueRouterIterator()) is None
+
+
+def test_filter_registry_reuse_keeps_other_results():
+    kept = SimpleRouter(filters=[IndexFilter(index=-3)])
+
+    data = RoutingData()
+    data.used_filters[IndexFilter(index=-3)] = True
+
+    released = SimpleRouter(filters=[IndexFilter(index=-4)])
+    data.used_filters[IndexFilter(index=-4)] = False
+
+    del released
+    router = SimpleRouter(filters=[IndexFilter(index=-5)], data="result")
+
+    # only the result of the reused id is dropped
+    assert router.route_sync(data, FirstTrueRouterIterator()) == "result"
+    assert data.used_filters[IndexFilter(index=-3)] is True
+    assert IndexFilter(index=-4) not in data.used_filters
+
+    assert kept.filters == [IndexFilter(index=-3)]
+
+
+def test_filter_registry_threads():
+    used = len(filter_registry)
+
+    def register(offset: int):
+        for index in range(2000):
+            SimpleRouter(filters=[IndexFilter(index=offset + index % 50)])
+
+    threads = [threading.Thread(target=register, args=(offset * 1000, )) for offset in range(4)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    assert len(filter_registry) == used
+    assert all(
+        filter_registry.ids[filter_] == filter_id
+        for filter_id, filter_ in enumerate(filter_registry.filters)
+        if filter_ is not None
+    )
+
+
+@pytest.mark.parametrize("copied", [False, True])
+def test_version_of_subtree(copied):
+    router = SimpleRouter(index_key="num")
+    child = SimpleRouter(data="child")
+    router.add_router(child)
+
+    if copied:
+        router = copy.deepcopy(router)
+        child = router.routers[0]
+
+    assert router.route_sync(RoutingData(request_data={"num": 1}), AllTrueRouterIterator()) == ["child"]
+
+    version = router.version
+    child.add_filter(IndexedFilter(num=2))
+
+    # the index of the parent is rebuilt with the new filter of the child
+    assert router.version != version
+    assert router.route_sync(RoutingData(request_data={"num": 1}), AllTrueRouterIterator()) == []
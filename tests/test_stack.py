@@ -0,0 +1,173 @@
+import sys
+import copy
+
+from functools import partial
+from contextlib import aclosing
+
+from dataclasses import dataclass
+
+import pytest
+
+from silvanus.integration.http import parse_path, TrieRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.routing.stack import StackRouter
+from silvanus.routing.metrics import RoutingMetrics
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import (
+    FirstTrueRouterIterator,
+    AllTrueRouterIterator,
+    FirstNTrueRouterIterator,
+    BestFirstRouterIterator
+)
+
+from helpers import ITERATORS, ValueFilter, CountMiddleware, get_tree, get_nested_tree
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class IndexFilter:
+    index: int
+
+    def __call__(self, data: RoutingData) -> bool:
+        data.filters_data.setdefault("indexes", []).append(self.index)
+
+        return True
+
+
+def get_stack_tree() -> SimpleRouter:
+    trie = TrieRouter()
+    trie.add_path("/user/{id:int}", SimpleRouter(data="trie"), method="GET")
+
+    return get_tree(SimpleRouter(filters=[ValueFilter(value=3)]), trie)
+
+
+@pytest.mark.parametrize("value", [1, 2, 3])
+@pytest.mark.parametrize(
+    "iterator",
+    [FirstTrueRouterIterator, AllTrueRouterIterator, partial(FirstNTrueRouterIterator, count=2)]
+)
+async def test_stack_same_as_tree(value, iterator):
+    tree = get_stack_tree()
+    router = StackRouter(tree)
+
+    tree_metrics = RoutingMetrics()
+    tree.set_metrics(tree_metrics)
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+    data.request_data["value"] = value
+    stack_data = copy.deepcopy(data)
+    sync_data = copy.deepcopy(data)
+
+    result = await tree.route(data, iterator())
+
+    stack_metrics = RoutingMetrics()
+    router.set_metrics(stack_metrics)
+
+    assert await router.route(stack_data, iterator()) == result
+    assert stack_data == data
+
+    assert router.route_sync(sync_data, iterator()) == result
+    assert sync_data == data
+
+    # the stack metrics saw two routing calls
+    for tree_calls, stack_calls in [
+        (tree_metrics.routers, stack_metrics.routers),
+        (tree_metrics.filters, stack_metrics.filters),
+        (tree_metrics.middlewares, stack_metrics.middlewares)
+    ]:
+        assert {
+            key: (calls.calls * 2, calls.passed * 2, calls.memo_hits * 2) for key, calls in tree_calls.items()
+        } == {
+            key: (calls.calls, calls.passed, calls.memo_hits) for key, calls in stack_calls.items()
+        }
+
+
+async def test_stack_nothing():
+    router = StackRouter(SimpleRouter(filters=[ValueFilter(value=1)], data="result"))
+
+    data = RoutingData(request_data={"value": 2})
+
+    assert await router.route(data, FirstTrueRouterIterator(on_nothing=1)) == 1
+    assert await router.route(data, AllTrueRouterIterator(on_nothing=1)) == 1
+
+    # the best-first search needs the children of every router
+    with pytest.raises(TypeError):
+        await router.route(data, BestFirstRouterIterator())
+
+
+async def test_stack_deep_tree():
+    depth = sys.getrecursionlimit() * 2
+
+    root = parent = SimpleRouter(inner_middlewares=[CountMiddleware(name="inner")])
+
+    for level in range(depth):
+        child = SimpleRouter(filters=[ValueFilter(value=1)], data=level if level == depth - 1 else None)
+        parent.add_router(child)
+        parent = child
+
+    router = StackRouter(root)
+
+    data = RoutingData(request_data={"value": 1})
+
+    assert await router.route(data, FirstTrueRouterIterator()) == depth - 1
+    assert data.middleware_data == {"inner": depth + 1}
+
+    data = RoutingData(request_data={"value": 1})
+
+    assert router.route_sync(data, AllTrueRouterIterator()) == [depth - 1]
+    assert data.filters_data == {"used": 1}
+
+    parent.add_router(SimpleRouter(data="new"))
+
+    assert await router.route(RoutingData(request_data={"value": 1}), AllTrueRouterIterator()) == [depth - 1, "new"]
+
+
+@pytest.mark.parametrize("iterator", ITERATORS)
+async def test_stack_nested(iterator):
+    for value in [1, 2]:
+        expected = await get_nested_tree().route(RoutingData(request_data={"value": value}), iterator())
+        result = await get_nested_tree(StackRouter).route(RoutingData(request_data={"value": value}), iterator())
+
+        assert result == expected
+
+        assert get_nested_tree(StackRouter).route_sync(
+            RoutingData(request_data={"value": value}),
+            iterator()
+        ) == expected
+
+
+@pytest.mark.parametrize("value", [1, 2, 3])
+async def test_stack_stream(value):
+    tree = get_stack_tree()
+    router = StackRouter(tree)
+
+    data = parse_path("/user/10", app_data={}, method="GET")
+    data.request_data["value"] = value
+    stream_data = copy.deepcopy(data)
+
+    result = await tree.route(data, AllTrueRouterIterator())
+
+    assert [value async for value in router.stream(stream_data)] == result
+    assert stream_data == data
+
+
+async def test_stack_stream_break():
+    root = SimpleRouter(filters=[ValueFilter(value=1)], inner_middlewares=[CountMiddleware(name="inner")])
+    root.add_routers(
+        [SimpleRouter(filters=[IndexFilter(index=index)], data=index + 1) for index in range(100)]
+    )
+
+    data = RoutingData(request_data={"value": 1})
+
+    async with aclosing(StackRouter(root).stream(data)) as stream:
+        async for value in stream:
+            assert value == 1
+            break
+
+    # the other subscribers were not checked, the inner middleware still
+    # ran for both passed levels, as with FirstTrueRouterIterator
+    assert data.filters_data == {"used": 1, "indexes": [0]}
+    assert data.middleware_data == {"inner": 2}
+
+    stream = StackRouter(root).stream(RoutingData(request_data={"value": 2}))
+
+    assert [value async for value in stream] == []
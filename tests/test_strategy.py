@@ -0,0 +1,263 @@
+import asyncio
+
+from dataclasses import dataclass
+
+import pytest
+
+from silvanus.routing.cache import CachedRouter
+from silvanus.routing.simple import SimpleRouter
+from silvanus.structures.base import RoutingData
+from silvanus.strategy.routers import (
+    AllTrueRouterIterator,
+    FirstNTrueRouterIterator,
+    BestFirstRouterIterator,
+    ParallelAllTrueRouterIterator
+)
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class DelayFilter:
+    delay: float
+    result: bool = True
+
+    async def __call__(self, data: RoutingData) -> bool:
+        await asyncio.sleep(self.delay)
+        return self.result
+
+
+def get_bus(subscribers: int, delay: float) -> SimpleRouter:
+    router = SimpleRouter(data="root")
+
+    for index in range(subscribers):
+        subscriber = SimpleRouter(
+            filters=[DelayFilter(delay=delay + index / 10000, result=index % 3 != 0)],
+            data=f"subscriber_{index}"
+        )
+        subscriber.add_router(SimpleRouter(data=f"nested_{index}"))
+
+        router.add_router(subscriber)
+
+    return router
+
+
+async def test_parallel_all_true():
+    router = get_bus(subscribers=10, delay=0.05)
+
+    started = asyncio.get_running_loop().time()
+    result = await router.route(RoutingData(), ParallelAllTrueRouterIterator())
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == await get_bus(subscribers=10, delay=0).route(RoutingData(), AllTrueRouterIterator())
+    assert elapsed < 0.2
+
+
+async def test_parallel_all_true_limit():
+    router = get_bus(subscribers=6, delay=0.02)
+
+    started = asyncio.get_running_loop().time()
+    result = await router.route(RoutingData(), ParallelAllTrueRouterIterator(limit=2))
+    elapsed = asyncio.get_running_loop().time() - started
+
+    assert result == await get_bus(subscribers=6, delay=0).route(RoutingData(), AllTrueRouterIterator())
+    assert elapsed >= 0.06
+
+
+async def test_parallel_all_true_many():
+    router = get_bus(subscribers=6, delay=0)
+    expected = await router.route(RoutingData(), AllTrueRouterIterator())
+
+    assert await router.route_many(
+        [RoutingData(), RoutingData()],
+        ParallelAllTrueRouterIterator()
+    ) == [expected, expected]
+
+
+async def test_parallel_all_true_nested_limit():
+    router = SimpleRouter(filters=[DelayFilter(delay=0)])
+    nested = router
+
+    for index in range(5):
+        child = SimpleRouter(filters=[DelayFilter(delay=0)], data=index)
+        nested.add_routers([child, SimpleRouter(data=f"sibling_{index}")])
+        nested = child
+
+    result = await asyncio.wait_for(
+        router.route(RoutingData(), ParallelAllTrueRouterIterator(limit=1)),
+        timeout=1
+    )
+
+    assert result == await router.route(RoutingData(), AllTrueRouterIterator())
+
+
+ALL_TRUE = AllTrueRouterIterator()
+
+
+async def test_all_true_shared_instance():
+    router = get_bus(subscribers=5, delay=0.01)
+    expected = await router.route(RoutingData(), AllTrueRouterIterator())
+
+    results = await asyncio.gather(
+        *[router.route(RoutingData(), ALL_TRUE) for _ in range(10)]
+    )
+
+    assert results == [expected] * 10
+    assert await router.route(RoutingData(), ALL_TRUE) == expected
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class CountFilter:
+    index: int
+
+    def __call__(self, data: RoutingData) -> bool:
+        data.filters_data["checked"] = data.filters_data.get("checked", 0) + 1
+        return self.index % 3 != 0
+
+
+def get_counted_bus(subscribers: int) -> SimpleRouter:
+    router = SimpleRouter(data="root")
+
+    for index in range(subscribers):
+        subscriber = SimpleRouter(filters=[CountFilter(index=index)], data=f"subscriber_{index}")
+        subscriber.add_router(SimpleRouter(data=f"nested_{index}"))
+
+        router.add_router(subscriber)
+
+    return router
+
+
+FIRST_3 = FirstNTrueRouterIterator(count=3)
+
+
+async def test_first_n_true():
+    router = get_counted_bus(subscribers=100)
+    expected = (await router.route(RoutingData(), AllTrueRouterIterator()))[:3]
+
+    data = RoutingData()
+
+    assert await router.route(data, FIRST_3) == expected == ["root", "subscriber_1", "nested_1"]
+    # the filters after the third result were not checked
+    assert data.filters_data == {"checked": 2}
+
+    assert router.route_sync(RoutingData(), FIRST_3) == expected
+    assert await router.route_many([RoutingData(), RoutingData()], FIRST_3) == [expected, expected]
+
+    results = await asyncio.gather(*[router.route(RoutingData(), FIRST_3) for _ in range(10)])
+
+    assert results == [expected] * 10
+
+    all_expected = await get_counted_bus(subscribers=5).route(RoutingData(), AllTrueRouterIterator())
+
+    assert await get_counted_bus(subscribers=5).route(
+        RoutingData(),
+        FirstNTrueRouterIterator(count=100)
+    ) == all_expected
+
+
+async def test_first_n_true_nothing():
+    router = SimpleRouter(filters=[CountFilter(index=0)], data="root")
+
+    assert await router.route(RoutingData(), FirstNTrueRouterIterator(count=1, on_nothing=1)) == 1
+
+    with pytest.raises(ValueError):
+        FirstNTrueRouterIterator(count=0)
+
+
+def get_priority_tree() -> SimpleRouter:
+    router = SimpleRouter()
+
+    first = SimpleRouter(filters=[CountFilter(index=1)], data="first", priority=1)
+    first.add_routers(
+        [
+            SimpleRouter(filters=[CountFilter(index=2)], data="first_low", priority=0),
+            SimpleRouter(filters=[CountFilter(index=4)], data="first_high", priority=5)
+        ]
+    )
+
+    second = SimpleRouter(filters=[CountFilter(index=5)])
+    second.add_routers(
+        [
+            SimpleRouter(filters=[CountFilter(index=7)], data="second_high", priority=5),
+            SimpleRouter(filters=[CountFilter(index=9)], data="hot", priority=10),
+        ]
+    )
+
+    router.add_routers([first, second, SimpleRouter(filters=[CountFilter(index=8)])])
+
+    return router
+
+
+async def test_best_first():
+    router = get_priority_tree()
+
+    assert router.priority_bound == 10
+
+    data = RoutingData()
+
+    # "hot" didn't pass, the best of the rest is the first with priority 5
+    assert await router.route(data, BestFirstRouterIterator()) == "first_high"
+    # the routers with a lower bound and the subtree without data are not checked
+    assert data.filters_data == {"checked": 4}
+
+    assert router.route_sync(RoutingData(), BestFirstRouterIterator()) == "first_high"
+    assert await router.route_many([RoutingData()], BestFirstRouterIterator()) == ["first_high"]
+
+    router.routers[1].routers[1].filters = [CountFilter(index=10)]
+    router.routers[1].routers[1]._register_filters()
+
+    data = RoutingData()
+
+    assert await router.route(data, BestFirstRouterIterator()) == "hot"
+    assert data.filters_data == {"checked": 2}
+
+    router.routers[0].priority = 20
+
+    assert router.priority_bound == 20
+    assert await router.route(RoutingData(), BestFirstRouterIterator()) == "first"
+
+
+async def test_best_first_nothing():
+    router = get_priority_tree()
+    router.routers = router.routers[2:]
+
+    assert await router.route(RoutingData(), BestFirstRouterIterator(on_nothing=1)) == 1
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class SleepMiddleware:
+    name: str
+    delay: float
+
+    async def __call__(self, data: RoutingData):
+        await asyncio.sleep(self.delay)
+        data.middleware_data[self.name] = data.middleware_data.get(self.name, 0) + 1
+
+
+async def test_parallel_all_true_inner_middlewares():
+    router = SimpleRouter()
+    router.add_routers(
+        [
+            SimpleRouter(data="a", inner_middlewares=[SleepMiddleware(name="a", delay=0.02)]),
+            # adds its inner middleware while the ones of "a" are awaited
+            SimpleRouter(
+                filters=[DelayFilter(delay=0.01)],
+                data="b",
+                inner_middlewares=[SleepMiddleware(name="b", delay=0)]
+            )
+        ]
+    )
+
+    expected = await router.route(RoutingData(), AllTrueRouterIterator())
+
+    assert await router.route(RoutingData(), ParallelAllTrueRouterIterator()) == expected == ["a", "b"]
+
+
+async def test_best_first_cached_child():
+    inner = SimpleRouter()
+    inner.add_router(SimpleRouter(data="leaf", priority=1))
+
+    router = SimpleRouter()
+    router.add_routers([CachedRouter(inner, key=lambda data: "key"), SimpleRouter(data="low")])
+
+    for _ in range(3):
+        assert await router.route(RoutingData(), BestFirstRouterIterator()) == "leaf"
+        assert router.route_sync(RoutingData(), BestFirstRouterIterator()) == "leaf"